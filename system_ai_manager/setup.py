@@ -17,6 +17,8 @@ setup(
         "watchdog>=2.1.6",
         "psutil>=5.8.0",
         "python-dotenv>=0.19.0",
+        "aiohttp>=3.8.0",
+        "packaging>=20.0",
     ],
     entry_points={
         'console_scripts': [
@@ -34,9 +36,7 @@ setup(
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
     ],
-    python_requires=">=3.7",
+    python_requires=">=3.10",
 ) 
\ No newline at end of file
@@ -783,7 +783,7 @@ async def analyze_dependencies(directory: str, save_report: bool = False):
     analyzer = DependencyAnalyzer()
     print(f"\nAnalyzing dependencies in {directory}...")
     
-    results = analyzer.analyze_dependencies(directory)
+    results = await analyzer.analyze_dependencies_async(directory)
     
     print_header("Dependency Analysis Results")
     
@@ -791,7 +791,7 @@ async def analyze_dependencies(directory: str, save_report: bool = False):
         print_error(results["error"])
         return
     
-    print(f"\nPackage Manager: {results['package_manager']}")
+    print(f"\nPackage Managers: {', '.join(results['package_managers'])}")
     print("\nDependencies:")
     for dep in results["dependencies"]:
         status_color = Fore.GREEN if not dep["is_outdated"] else Fore.YELLOW
@@ -9,6 +9,16 @@ import isort
 import autopep8
 from datetime import datetime
 
+# Cheap textual prefilter for the patterns reported by _find_patterns: print
+# calls, old-style %-formatting and class statements; whether a class has
+# bases (keywords such as metaclass= do not count) is left to the AST. Files
+# that match none of these can skip the pattern walk.
+_CANDIDATE_RE = re.compile(
+    rb'\bprint\s*\('
+    rb'|%(?:\([^)]*\))?[-#0 +]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[diouxXeEfFgGcrsa%]'
+    rb'|\bclass\s+\w+\s*[(:[]'
+)
+
 @dataclass
 class MigrationConfig:
     """Configuration for code migration."""
@@ -111,8 +121,9 @@ class CodeMigrator:
                     file_path = os.path.join(root, file)
                     
                     # Parse the file
-                    with open(file_path, 'r') as f:
-                        tree = ast.parse(f.read())
+                    with open(file_path, 'rb') as f:
+                        source = f.read()
+                    tree = ast.parse(source)
                         
                     # Get module info
                     module = {
@@ -134,9 +145,10 @@ class CodeMigrator:
                             func_info = self._analyze_function(node, file_path)
                             code_info["functions"].append(func_info)
                             
-                    # Find patterns
-                    patterns = self._find_patterns(tree, file_path)
-                    code_info["patterns"].extend(patterns)
+                    # Find patterns, skipping files that cannot contain any
+                    if _CANDIDATE_RE.search(source):
+                        patterns = self._find_patterns(tree, file_path)
+                        code_info["patterns"].extend(patterns)
                     
         return code_info
     
@@ -371,29 +383,34 @@ class CodeMigrator:
         """Generate test files for the codebase."""
         tests_dir = os.path.join(source_dir, "tests")
         os.makedirs(tests_dir, exist_ok=True)
-        
+
+        # Group class and function names by path in a single pass each,
+        # so every module looks its names up instead of rescanning all
+        class_names = self._group_names_by_path(code_info["classes"])
+        func_names = self._group_names_by_path(code_info["functions"])
+
         # Generate tests for each module
         for module in code_info["modules"]:
             test_file = os.path.join(tests_dir, f"test_{module['name']}.py")
-            
+
             with open(test_file, 'w') as f:
                 f.write(f"import unittest\n")
                 f.write(f"from {module['name']} import *\n\n")
                 f.write(f"class Test{module['name'].title()}(unittest.TestCase):\n")
-                
-                # Generate tests for each class
-                for class_info in code_info["classes"]:
-                    if class_info["path"] == module["path"]:
-                        f.write(f"\n    def test_{class_info['name'].lower()}(self):\n")
-                        f.write(f"        # TODO: Implement test for {class_info['name']}\n")
-                        f.write(f"        pass\n")
-                        
-                # Generate tests for each function
-                for func in code_info["functions"]:
-                    if func["path"] == module["path"]:
-                        f.write(f"\n    def test_{func['name'].lower()}(self):\n")
-                        f.write(f"        # TODO: Implement test for {func['name']}\n")
-                        f.write(f"        pass\n")
+
+                # Generate tests for each class, then each function
+                for name in (class_names.get(module["path"], []) +
+                             func_names.get(module["path"], [])):
+                    f.write(f"\n    def test_{name.lower()}(self):\n")
+                    f.write(f"        # TODO: Implement test for {name}\n")
+                    f.write(f"        pass\n")
+
+    def _group_names_by_path(self, items: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Group element names by the path of the file defining them."""
+        names_by_path = {}
+        for item in items:
+            names_by_path.setdefault(item["path"], []).append(item["name"])
+        return names_by_path
     
     def _get_imports(self, tree: ast.AST) -> List[str]:
         """Get all imports from a module."""
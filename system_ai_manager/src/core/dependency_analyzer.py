@@ -1,12 +1,130 @@
 import os
+import re
 import json
-import pkg_resources
+import logging
+import asyncio
+import contextlib
+import functools
+import sqlite3
+import time
+import threading
+import shutil
 import subprocess
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from graphlib import TopologicalSorter, CycleError
 from pathlib import Path
+from urllib.parse import quote
+from importlib.metadata import distributions
+import aiohttp
+from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
+from packaging.version import Version, InvalidVersion
 
-@dataclass
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+PYPI_URL = 'https://pypi.org/pypi/{}/json'
+NPM_REGISTRY_URL = 'https://registry.npmjs.org/{}'
+OSV_QUERYBATCH_URL = 'https://api.osv.dev/v1/querybatch'
+# OSV accepts at most this many queries per batch request
+OSV_BATCH_SIZE = 1000
+
+# Seconds before an npm invocation is abandoned
+SUBPROCESS_TIMEOUT = 30
+
+# pip treats '#' at the start of a line or after whitespace as a comment
+_COMMENT_RE = re.compile(r'(?:^|\s+)#.*$')
+_NPM_VERSION_RE = re.compile(r'\d+(?:\.\d+)*(?:-[0-9A-Za-z.-]+)?')
+
+# Registry lookups are shared across runs through this SQLite database
+CACHE_PATH = os.path.join(Path.home(), '.cache', 'system_ai_manager', 'dependencies.db')
+
+# In-process layer in front of the SQLite cache, shared by all analyzers
+_memory_cache: Dict[str, tuple] = {}
+# analyze_many runs analyzers on several threads at once
+_memory_cache_lock = threading.Lock()
+MEMORY_CACHE_SIZE = 4096
+
+def disk_cached(ttl: int):
+    """Cache the JSON result of an async analyzer lookup for `ttl` seconds.
+
+    Results are kept in memory for the life of the process and on disk
+    across runs, unless the analyzer was created with cache_path=None.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args):
+            # cache_path=None disables both layers
+            if self.cache_path is None:
+                return await func(self, *args)
+            key = json.dumps([func.__name__, *args])
+            with _memory_cache_lock:
+                hit = _memory_cache.get(key)
+            if hit and time.time() - hit[1] < ttl:
+                return hit[0]
+            
+            db = self._get_cache_db()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        'SELECT value, stored_at FROM lookups WHERE key = ?', (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    # e.g. "database is locked" while analyze_many threads write
+                    logger.warning("Dependency cache read failed: %s", e)
+                    row = None
+                if row and time.time() - row[1] < ttl:
+                    value = json.loads(row[0])
+                    _remember(key, value, row[1])
+                    return value
+            
+            value = await func(self, *args)
+            # Failed lookups are not cached so the next run retries them
+            if value is not None:
+                stored_at = time.time()
+                _remember(key, value, stored_at)
+                if db is not None:
+                    try:
+                        db.execute(
+                            'INSERT OR REPLACE INTO lookups VALUES (?, ?, ?)',
+                            (key, json.dumps(value), stored_at)
+                        )
+                        db.commit()
+                    except sqlite3.Error as e:
+                        logger.warning("Dependency cache write failed: %s", e)
+                        # Leave no half-finished transaction behind for the next write
+                        with contextlib.suppress(sqlite3.Error):
+                            db.rollback()
+            return value
+        return wrapper
+    return decorator
+
+def _remember(key: str, value: Any, stored_at: float):
+    """Store a lookup result in the in-process cache, evicting the oldest entry when full."""
+    with _memory_cache_lock:
+        _memory_cache.pop(key, None)
+        if len(_memory_cache) >= MEMORY_CACHE_SIZE:
+            _memory_cache.pop(next(iter(_memory_cache)))
+        _memory_cache[key] = (value, stored_at)
+
+def _installed_distributions() -> Dict[str, Any]:
+    """Map canonical names to installed distributions, keeping the importable one."""
+    installed = {}
+    # distributions() follows sys.path, so the first match is the one import finds
+    for dist in distributions():
+        name = dist.metadata['Name']
+        if name:
+            installed.setdefault(canonicalize_name(name), dist)
+    return installed
+
+@dataclass(slots=True)
 class DependencyInfo:
     name: str
     version: str
@@ -19,7 +137,7 @@ class DependencyInfo:
 class DependencyAnalyzer:
     """Analyzes project dependencies and provides insights."""
     
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = CACHE_PATH, installed: Optional[Dict[str, Any]] = None):
         self.supported_managers = {
             'python': ['requirements.txt', 'setup.py', 'Pipfile', 'pyproject.toml'],
             'node': ['package.json'],
@@ -27,203 +145,439 @@ class DependencyAnalyzer:
             'php': ['composer.json'],
             'java': ['pom.xml', 'build.gradle']
         }
+        self._file_to_manager = {
+            file: manager
+            for manager, files in self.supported_managers.items()
+            for file in files
+        }
+        # Upper bound on packages being looked up at the same time
+        self.max_concurrent_lookups = 8
+        # Resolve tool paths once instead of searching PATH on every call
+        self._tools = {tool: shutil.which(tool) for tool in ('npm',)}
+        # Installed Python distributions keyed by canonical name
+        self._installed = installed if installed is not None else _installed_distributions()
+        # Per-run results of the batched npm calls and OSV queries
+        self._npm_audit_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._npm_ls_cache: Optional[Dict[str, Any]] = None
+        self._osv_cache: Dict[str, List[Dict[str, Any]]] = {}
+        # Keep-alive HTTP session and registry responses for the current run
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._registry_info: Dict[tuple, asyncio.Future] = {}
+        # Persistent lookup cache, disabled when cache_path is None
+        self.cache_path = cache_path
+        self._cache_db: Optional[sqlite3.Connection] = None
     
-    def detect_package_manager(self, directory: str) -> Optional[str]:
-        """Detect the package manager used in the project."""
-        for manager, files in self.supported_managers.items():
-            for file in files:
-                if os.path.exists(os.path.join(directory, file)):
-                    return manager
-        return None
+    def detect_package_managers(self, directory: str) -> List[str]:
+        """Detect all package managers used in the project."""
+        # One directory read instead of a stat per candidate manifest
+        try:
+            with os.scandir(directory) as entries:
+                found = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            return []
+        
+        managers = []
+        for file, manager in self._file_to_manager.items():
+            if file in found and manager not in managers:
+                managers.append(manager)
+        return managers
     
-    def analyze_python_dependencies(self, directory: str) -> List[DependencyInfo]:
+    async def analyze_python_dependencies(self, directory: str) -> List[DependencyInfo]:
         """Analyze Python project dependencies."""
-        dependencies = []
+        packages = self._read_requirements(directory)
+        
+        async with self._http_session():
+            await self._load_osv_vulnerabilities(packages, 'PyPI')
+            return await self._analyze_packages(packages, 'pip')
+    
+    async def analyze_python_dependency_tree(self, directory: str) -> List[DependencyInfo]:
+        """Analyze the requirements and all of their installed transitive dependencies."""
+        installed = self._installed
+        
+        # Build the package -> requirements graph from installed metadata
+        graph: Dict[str, List[str]] = {}
+        pending = [canonicalize_name(name) for name, _ in self._read_requirements(directory)]
+        while pending:
+            key = pending.pop()
+            if key in graph:
+                continue
+            graph[key] = self._get_installed_requires(installed[key])
+            pending.extend(graph[key])
+        
+        packages = [(installed[key].metadata['Name'], installed[key].version) for key in graph]
+        results: Dict[str, Optional[DependencyInfo]] = {}
+        async with self._http_session():
+            await self._load_osv_vulnerabilities(packages, 'PyPI')
+            semaphore = asyncio.Semaphore(self.max_concurrent_lookups)
+            
+            async def resolve(key: str):
+                dist = installed[key]
+                results[key] = await self._analyze_package(
+                    semaphore, dist.metadata['Name'], dist.version, 'pip'
+                )
+            
+            await self._walk_graph(graph, resolve)
+        
+        return [results[key] for key in graph if results.get(key) is not None]
+    
+    async def _walk_graph(self, graph: Dict[str, List[str]], resolve: Callable[[str], Awaitable[None]]):
+        """Resolve each node of a dependency graph as soon as its dependencies are resolved.
+
+        Nodes are scheduled the moment their last dependency finishes rather
+        than level by level, so one slow package only delays its dependents.
+        """
+        sorter = TopologicalSorter(graph)
+        try:
+            sorter.prepare()
+        except CycleError:
+            # No valid order exists, so resolve everything at once
+            await asyncio.gather(*[resolve(node) for node in graph])
+            return
+        
+        tasks: Dict[asyncio.Future, str] = {}
+        while sorter.is_active():
+            for node in sorter.get_ready():
+                tasks[asyncio.ensure_future(resolve(node))] = node
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                sorter.done(tasks.pop(task))
+                task.result()
+    
+    def _get_requires(self, dist: Any) -> List[str]:
+        """Get the names of the requirements a distribution installs by default."""
+        requires = []
+        for line in dist.requires or []:
+            req = Requirement(line)
+            # Requirements only pulled in by extras are not installed by default
+            if req.marker and not req.marker.evaluate({'extra': ''}):
+                continue
+            requires.append(req.name)
+        return requires
+    
+    def _get_installed_requires(self, dist: Any) -> List[str]:
+        """Get the canonical names of the installed requirements of a distribution."""
+        keys = [canonicalize_name(name) for name in self._get_requires(dist)]
+        return [key for key in keys if key in self._installed]
+    
+    def _read_requirements(self, directory: str) -> List[tuple]:
+        """Read requirements.txt and resolve each entry to its installed (name, version)."""
+        packages = []
         
         # Check requirements.txt
         req_file = os.path.join(directory, 'requirements.txt')
         if os.path.exists(req_file):
             with open(req_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        try:
-                            pkg = pkg_resources.working_set.by_key[line.split('==')[0]]
-                            latest = self._get_latest_version(pkg.key)
-                            deps = self._get_dependencies(pkg.key)
-                            vulns = self._check_vulnerabilities(pkg.key, pkg.version)
-                            
-                            dependencies.append(DependencyInfo(
-                                name=pkg.key,
-                                version=pkg.version,
-                                latest_version=latest,
-                                is_outdated=latest and pkg.version < latest,
-                                vulnerabilities=vulns,
-                                license=self._get_license(pkg.key),
-                                dependencies=deps
-                            ))
-                        except Exception as e:
-                            print(f"Error analyzing {line}: {str(e)}")
+                # Join backslash continuation lines before splitting
+                lines = f.read().replace('\\\n', '').splitlines()
+            for line in lines:
+                line = _COMMENT_RE.sub('', line).strip()
+                # Skip blank lines and pip options such as -r or -e
+                if not line or line.startswith('-'):
+                    continue
+                try:
+                    req = Requirement(line)
+                    if req.marker and not req.marker.evaluate():
+                        continue
+                    dist = self._installed[canonicalize_name(req.name)]
+                    packages.append((dist.metadata['Name'], dist.version))
+                except Exception as e:
+                    logger.warning("Error analyzing %s: %s", line, e)
         
-        return dependencies
+        return packages
     
-    def analyze_node_dependencies(self, directory: str) -> List[DependencyInfo]:
+    async def analyze_node_dependencies(self, directory: str) -> List[DependencyInfo]:
         """Analyze Node.js project dependencies."""
-        dependencies = []
+        packages = []
         package_json = os.path.join(directory, 'package.json')
         
         if os.path.exists(package_json):
-            with open(package_json, 'r') as f:
-                data = json.load(f)
+            with open(package_json, 'rb') as f:
+                data = json_loads(f.read())
                 deps = {**data.get('dependencies', {}), **data.get('devDependencies', {})}
-                
-                for name, version in deps.items():
-                    try:
-                        latest = self._get_latest_version(name, 'npm')
-                        vulns = self._check_vulnerabilities(name, version, 'npm')
-                        subdeps = self._get_dependencies(name, 'npm')
-                        
-                        dependencies.append(DependencyInfo(
-                            name=name,
-                            version=version,
-                            latest_version=latest,
-                            is_outdated=latest and version < latest,
-                            vulnerabilities=vulns,
-                            license=self._get_license(name, 'npm'),
-                            dependencies=subdeps
-                        ))
-                    except Exception as e:
-                        print(f"Error analyzing {name}: {str(e)}")
+                packages = list(deps.items())
         
-        return dependencies
+        async with self._http_session():
+            await asyncio.gather(
+                self._load_npm_audit(directory),
+                self._load_npm_ls(directory)
+            )
+            return await self._analyze_packages(packages, 'npm')
     
-    def _get_latest_version(self, package: str, manager: str = 'pip') -> Optional[str]:
-        """Get the latest version of a package."""
-        try:
-            if manager == 'pip':
-                result = subprocess.run(
-                    ['pip', 'index', 'versions', package],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    # Parse the output to get the latest version
-                    return result.stdout.split('\n')[0].split(' ')[-1]
-            elif manager == 'npm':
-                result = subprocess.run(
-                    ['npm', 'view', package, 'version'],
-                    capture_output=True,
-                    text=True
+    async def _analyze_packages(self, packages: List[tuple], manager: str) -> List[DependencyInfo]:
+        """Look up metadata for all packages concurrently."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_lookups)
+        results = await asyncio.gather(*[
+            self._analyze_package(semaphore, name, version, manager)
+            for name, version in packages
+        ])
+        return [dep for dep in results if dep is not None]
+    
+    async def _analyze_package(self, semaphore: asyncio.Semaphore, name: str,
+                               version: str, manager: str) -> Optional[DependencyInfo]:
+        """Run the metadata lookups for a single package concurrently."""
+        async with semaphore:
+            try:
+                latest, vulns, deps, license = await asyncio.gather(
+                    self._get_latest_version(name, manager),
+                    self._check_vulnerabilities(name, version, manager),
+                    self._get_dependencies(name, manager),
+                    self._get_license(name, manager)
                 )
-                if result.returncode == 0:
-                    return result.stdout.strip()
+            except Exception as e:
+                logger.warning("Error analyzing %s: %s", name, e)
+                return None
+        
+        return DependencyInfo(
+            name=name,
+            version=version,
+            latest_version=latest,
+            is_outdated=self._is_outdated(version, latest, manager),
+            vulnerabilities=vulns or [],
+            license=license,
+            dependencies=deps
+        )
+    
+    def _is_outdated(self, version: str, latest: Optional[str], manager: str) -> bool:
+        """Check whether a version is older than the latest release."""
+        if not latest:
+            return False
+        if manager == 'npm':
+            # package.json holds ranges such as ^1.2.3; compare their base version
+            match = _NPM_VERSION_RE.search(version)
+            if match is None:
+                return False
+            version = match.group(0)
+        try:
+            return Version(version) < Version(latest)
+        except InvalidVersion:
+            return False
+    
+    async def _run(self, tool: str, *args: str, cwd: Optional[str] = None,
+                   text: bool = True) -> Optional[subprocess.CompletedProcess]:
+        """Run a command without blocking the event loop.
+
+        Output is decoded unless `text` is False, in which case the raw
+        bytes are returned for direct JSON parsing.
+        Returns None if the tool is not installed or does not finish in time.
+        """
+        executable = self._tools.get(tool)
+        if executable is None:
+            return None
+        process = await asyncio.create_subprocess_exec(
+            executable, *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=cwd
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), SUBPROCESS_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return None
+        return subprocess.CompletedProcess(
+            [executable, *args], process.returncode, stdout.decode() if text else stdout
+        )
+    
+    @contextlib.asynccontextmanager
+    async def _http_session(self):
+        """Share one keep-alive HTTP session across all lookups of a run."""
+        if self._http is not None:
+            yield self._http
+            return
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32),
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as session:
+            self._http = session
+            self._registry_info = {}
+            try:
+                yield session
+            finally:
+                self._http = None
+                self._registry_info = {}
+    
+    async def _get_registry_info(self, package: str, manager: str) -> Optional[Dict[str, Any]]:
+        """Fetch registry metadata for a package, once per run."""
+        key = (manager, package)
+        if key not in self._registry_info:
+            self._registry_info[key] = asyncio.ensure_future(
+                self._fetch_registry_info(package, manager)
+            )
+        return await self._registry_info[key]
+    
+    async def _fetch_registry_info(self, package: str, manager: str) -> Optional[Dict[str, Any]]:
+        """Request package metadata from PyPI or the npm registry."""
+        if manager == 'pip':
+            url = PYPI_URL.format(quote(package))
+        else:
+            url = NPM_REGISTRY_URL.format(quote(package, safe='@'))
+        async with self._http.get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.json(loads=json_loads)
+    
+    async def _load_osv_vulnerabilities(self, packages: List[tuple], ecosystem: str):
+        """Query OSV for all packages in batches and index the results by name."""
+        self._osv_cache = {}
+        try:
+            for start in range(0, len(packages), OSV_BATCH_SIZE):
+                batch = packages[start:start + OSV_BATCH_SIZE]
+                payload = {"queries": [
+                    {"package": {"name": name, "ecosystem": ecosystem}, "version": version}
+                    for name, version in batch
+                ]}
+                async with self._http.post(OSV_QUERYBATCH_URL, json=payload) as response:
+                    if response.status != 200:
+                        continue
+                    data = await response.json(loads=json_loads)
+                for (name, _), result in zip(batch, data.get('results', [])):
+                    self._osv_cache[name] = result.get('vulns', [])
         except Exception:
             pass
-        return None
     
-    def _check_vulnerabilities(self, package: str, version: str, manager: str = 'pip') -> List[Dict[str, Any]]:
-        """Check for known vulnerabilities in a package."""
-        vulnerabilities = []
+    async def _load_npm_audit(self, directory: str):
+        """Run `npm audit` once for the project and index advisories by package."""
+        self._npm_audit_cache = {}
         try:
-            if manager == 'pip':
-                result = subprocess.run(
-                    ['safety', 'check', f'{package}=={version}', '--json'],
-                    capture_output=True,
-                    text=True
+            result = await self._run('npm', 'audit', '--json', cwd=directory, text=False)
+            if result is not None and result.returncode != 0:
+                audit_data = json_loads(result.stdout)
+                # npm 6 reports advisories keyed by id, npm 7+ reports
+                # vulnerabilities keyed by package name
+                for advisory in audit_data.get('advisories', {}).values():
+                    self._npm_audit_cache.setdefault(advisory.get('module_name'), []).append(advisory)
+                for name, vulnerability in audit_data.get('vulnerabilities', {}).items():
+                    self._npm_audit_cache.setdefault(name, []).append(vulnerability)
+        except Exception:
+            pass
+    
+    async def _load_npm_ls(self, directory: str):
+        """Run `npm ls` once for the project and keep the dependency tree."""
+        self._npm_ls_cache = {}
+        try:
+            result = await self._run('npm', 'ls', '--json', cwd=directory, text=False)
+            if result is not None and result.returncode == 0:
+                self._npm_ls_cache = json_loads(result.stdout)
+        except Exception:
+            pass
+    
+    def _get_cache_db(self) -> Optional[sqlite3.Connection]:
+        """Open the persistent lookup cache on first use."""
+        if self._cache_db is None and self.cache_path:
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                db = sqlite3.connect(self.cache_path, check_same_thread=False)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS lookups '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)'
                 )
-                if result.returncode != 0:
-                    vulnerabilities = json.loads(result.stdout)
+                self._cache_db = db
+            except (OSError, sqlite3.Error):
+                # Run without the cache rather than failing the analysis
+                self.cache_path = None
+        return self._cache_db
+    
+    @disk_cached(ttl=86400)
+    async def _get_latest_version(self, package: str, manager: str = 'pip') -> Optional[str]:
+        """Get the latest version of a package."""
+        try:
+            info = await self._get_registry_info(package, manager)
+            if info is None:
+                return None
+            if manager == 'pip':
+                return info['info']['version']
             elif manager == 'npm':
-                result = subprocess.run(
-                    ['npm', 'audit', '--json'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode != 0:
-                    audit_data = json.loads(result.stdout)
-                    if package in audit_data.get('advisories', {}):
-                        vulnerabilities = audit_data['advisories'][package]
+                return info['dist-tags']['latest']
         except Exception:
             pass
-        return vulnerabilities
+        return None
+    
+    async def _check_vulnerabilities(self, package: str, version: str, manager: str = 'pip') -> Optional[List[Dict[str, Any]]]:
+        """Check for known vulnerabilities in a package.
+
+        Returns None when no data is available for the package.
+        """
+        if manager == 'pip':
+            return self._osv_cache.get(package)
+        elif manager == 'npm':
+            return self._npm_audit_cache.get(package)
+        return None
     
-    def _get_dependencies(self, package: str, manager: str = 'pip') -> List[str]:
+    async def _get_dependencies(self, package: str, manager: str = 'pip') -> List[str]:
         """Get direct dependencies of a package."""
         dependencies = []
         try:
             if manager == 'pip':
-                result = subprocess.run(
-                    ['pip', 'show', package],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if line.startswith('Requires:'):
-                            dependencies = [d.strip() for d in line.split(':')[1].split(',')]
+                dist = self._installed.get(canonicalize_name(package))
+                if dist is not None:
+                    dependencies = self._get_requires(dist)
             elif manager == 'npm':
-                result = subprocess.run(
-                    ['npm', 'ls', '--json'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    data = json.loads(result.stdout)
-                    if package in data.get('dependencies', {}):
-                        dependencies = list(data['dependencies'][package].get('dependencies', {}).keys())
+                tree = (self._npm_ls_cache or {}).get('dependencies', {})
+                dependencies = list(tree.get(package, {}).get('dependencies', {}).keys())
         except Exception:
             pass
         return dependencies
     
-    def _get_license(self, package: str, manager: str = 'pip') -> Optional[str]:
+    @disk_cached(ttl=86400)
+    async def _get_license(self, package: str, manager: str = 'pip') -> Optional[str]:
         """Get the license of a package."""
         try:
             if manager == 'pip':
-                result = subprocess.run(
-                    ['pip', 'show', package],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if line.startswith('License:'):
-                            return line.split(':')[1].strip()
+                dist = self._installed.get(canonicalize_name(package))
+                if dist is not None:
+                    license = dist.metadata.get('License-Expression') or dist.metadata.get('License')
+                    if license:
+                        return license
+                info = await self._get_registry_info(package, 'pip')
+                return info['info'].get('license') if info else None
             elif manager == 'npm':
-                result = subprocess.run(
-                    ['npm', 'view', package, 'license'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip()
+                info = await self._get_registry_info(package, 'npm')
+                license = info.get('license') if info else None
+                # Old packages describe the license as {"type": ..., "url": ...}
+                if isinstance(license, dict):
+                    license = license.get('type')
+                return license
         except Exception:
             pass
         return None
     
     def analyze_dependencies(self, directory: str) -> Dict[str, Any]:
         """Analyze all dependencies in a project."""
-        manager = self.detect_package_manager(directory)
-        if not manager:
+        return asyncio.run(self.analyze_dependencies_async(directory))
+    
+    def analyze_many(self, directories: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Analyze the dependencies of several projects concurrently."""
+        # Each project gets its own analyzer since the per-run caches
+        # are instance state; the disk cache is shared through SQLite and
+        # the read-only map of installed distributions is built only once
+        def analyze(directory: str) -> Dict[str, Any]:
+            return DependencyAnalyzer(self.cache_path, self._installed).analyze_dependencies(directory)
+        
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 4) as executor:
+            return dict(zip(directories, executor.map(analyze, directories)))
+    
+    async def analyze_dependencies_async(self, directory: str) -> Dict[str, Any]:
+        """Analyze all dependencies in a project without blocking the event loop."""
+        managers = self.detect_package_managers(directory)
+        if not managers:
             return {"error": "No supported package manager found"}
         
-        dependencies = []
-        if manager == 'python':
-            dependencies = self.analyze_python_dependencies(directory)
-        elif manager == 'node':
-            dependencies = self.analyze_node_dependencies(directory)
+        # Polyglot projects get every supported ecosystem analyzed at once
+        analyzers = {
+            'python': self.analyze_python_dependencies,
+            'node': self.analyze_node_dependencies
+        }
+        async with self._http_session():
+            results = await asyncio.gather(*[
+                analyzers[manager](directory)
+                for manager in managers if manager in analyzers
+            ])
+        dependencies = [dep for result in results for dep in result]
         
         return {
-            "package_manager": manager,
-            "dependencies": [
-                {
-                    "name": dep.name,
-                    "version": dep.version,
-                    "latest_version": dep.latest_version,
-                    "is_outdated": dep.is_outdated,
-                    "vulnerabilities": dep.vulnerabilities,
-                    "license": dep.license,
-                    "dependencies": dep.dependencies
-                }
-                for dep in dependencies
-            ]
+            "package_managers": managers,
+            "dependencies": [asdict(dep) for dep in dependencies]
         } 
\ No newline at end of file
@@ -1,17 +1,135 @@
 from dataclasses import dataclass
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Iterator, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import os
 import json
-import requests
 from pathlib import Path
 import ast
-import inspect
+import contextlib
+import functools
+import hashlib
+import mmap
+import pickle
 import re
-import graphviz
-import markdown
-import yaml
+import shutil
+import sys
+import tempfile
+import threading
 from datetime import datetime
 
+if TYPE_CHECKING:
+    import graphviz
+    import markdown
+
+try:
+    import orjson
+    
+    def json_dumps_indented(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def json_dumps_indented(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# Per-user home of cached syntax trees; never inside the tree being documented,
+# since loading a pickle planted there would run arbitrary code
+AST_CACHE_DIR = os.path.join(Path.home(), '.cache', 'system_ai_manager', 'doc_ast')
+# Per-user home of rendered diagrams, kept out of the working directory
+DIAGRAM_CACHE_DIR = os.path.join(Path.home(), '.cache', 'system_ai_manager', 'doc_diagrams')
+# Bump to invalidate cached syntax trees when their layout changes
+AST_CACHE_VERSION = 1
+# Cached trees are only valid for the interpreter that produced them
+_AST_CACHE_TAG = f"{sys.implementation.cache_tag}:{sys.version}:{AST_CACHE_VERSION}".encode()
+
+# Decorator attributes marking FastAPI/Flask route handlers, e.g. @router.get(...)
+_ROUTE_ATTRS = frozenset({'get', 'post', 'put', 'delete', 'patch', 'route'})
+
+# Nested scopes whose calls are not part of the enclosing function's sequence
+_SEQUENCE_SKIP = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+# Nodes that can never contain a call
+_SEQUENCE_LEAVES = (
+    ast.Name, ast.Constant, ast.expr_context, ast.operator, ast.cmpop,
+    ast.boolop, ast.unaryop, ast.alias, ast.arg
+)
+
+# Directories never searched for source files
+_SKIP_DIRS = frozenset({'__pycache__', '.git', 'venv', '.venv', 'node_modules'})
+
+# Serializes in-process Graphviz rendering
+_GVC_LOCK = threading.Lock()
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_PARSE_MIN_FILES = 32
+
+@functools.lru_cache(maxsize=None)
+def _markdown_converter() -> "markdown.Markdown":
+    """Shared converter so extensions are loaded once; reset() clears per-document state."""
+    import markdown
+    return markdown.Markdown(extensions=['fenced_code'])
+
+# Look for :param: or :param name: patterns
+_PARAM_RE = re.compile(r":param\s+(\w+):")
+
+@functools.lru_cache(maxsize=4096)
+def _docstring_params(docstring: str) -> Tuple[str, ...]:
+    """Return the names documented with :param name: in a docstring."""
+    return tuple(_PARAM_RE.findall(docstring))
+
+def _is_type_checking(test: ast.expr) -> bool:
+    """Tell whether an if-test is ``TYPE_CHECKING`` or ``typing.TYPE_CHECKING``."""
+    if isinstance(test, ast.Name):
+        return test.id == 'TYPE_CHECKING'
+    return isinstance(test, ast.Attribute) and test.attr == 'TYPE_CHECKING'
+
+@contextlib.contextmanager
+def _map_source(path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Expose a file's bytes through a read-only memory map instead of a copy."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # Empty files cannot be mapped
+        if os.fstat(fd).st_size == 0:
+            yield b""
+        else:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as buf:
+                yield buf
+    finally:
+        os.close(fd)
+
+def _parse_file(path: str) -> ast.Module:
+    """Parse a Python file without reading it into an intermediate string."""
+    with _map_source(path) as source:
+        return ast.parse(source, filename=path)
+
+def _parse_one(path: str, cache_dir: Optional[str]) -> Tuple[str, ast.Module]:
+    """Parse a Python file, reusing the tree cached on disk when its source is unchanged."""
+    with _map_source(path) as source:
+        if not cache_dir:
+            return path, ast.parse(source, filename=path)
+            
+        digest = hashlib.sha256(source)
+        digest.update(_AST_CACHE_TAG)
+        cache_path = os.path.join(cache_dir, f"{digest.hexdigest()}.pkl")
+        try:
+            with open(cache_path, 'rb') as f:
+                tree = pickle.load(f)
+            if isinstance(tree, ast.Module):
+                return path, tree
+        except Exception:
+            # Missing, truncated or corrupt entries count as misses and are rewritten
+            pass
+            
+        tree = ast.parse(source, filename=path)
+        
+    try:
+        # Write to a temporary file first so readers never see a partial tree
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(tree, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return path, tree
+
 @dataclass
 class DocumentationConfig:
     """Configuration for documentation generation."""
@@ -22,6 +140,39 @@ class DocumentationConfig:
     include_examples: bool = True
     generate_diagrams: bool = True
     template_path: Optional[str] = None
+    ast_cache_dir: Optional[str] = AST_CACHE_DIR  # None disables the cache
+    diagram_cache_dir: Optional[str] = DIAGRAM_CACHE_DIR  # None disables the cache
+
+class _Collector(ast.NodeVisitor):
+    """Hand top-level classes and functions of a module to the generator.
+
+    Class bodies are not entered: methods are described by _get_class_methods
+    rather than listed as module functions. Function bodies are searched only
+    for route handlers, such as those an app factory declares.
+    """
+    
+    def __init__(self, generator: "DocumentationGenerator", module: Dict[str, Any], info: Dict[str, Any]):
+        self.generator = generator
+        self.module = module
+        self.info = info
+        
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.generator._collect_class(node, self.module, self.info)
+        
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.generator._collect_function(node, self.module, self.info)
+        self._collect_nested_routes(node)
+        
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def _collect_nested_routes(self, node: ast.AST):
+        """Collect route-decorated functions anywhere below node, outside classes."""
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                continue
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and self.generator._get_http_method(child):
+                self.generator._collect_function(child, self.module, self.info)
+            self._collect_nested_routes(child)
 
 class DocumentationGenerator:
     """AI-driven documentation generation system."""
@@ -29,6 +180,8 @@ class DocumentationGenerator:
     def __init__(self, settings):
         self.settings = settings
         self.config = DocumentationConfig(output_dir="docs")
+        # source_dir -> (file fingerprint, _analyze_all result)
+        self._analysis_cache: Dict[str, tuple] = {}
         
     def generate_api_docs(self, source_dir: str) -> Dict[str, Any]:
         """Generate API documentation from source code."""
@@ -174,30 +327,32 @@ class DocumentationGenerator:
                 "diagrams": []
             }
             
+            planned = []
+            
             # Generate component diagram
             if "components" in arch_info:
-                component_diagram = self._generate_component_diagram(arch_info["components"])
-                diagrams["diagrams"].append({
-                    "type": "component",
-                    "path": self._save_diagram(component_diagram, "component")
-                })
+                planned.append(("component", self._generate_component_diagram(arch_info["components"])))
                 
             # Generate class diagram
             if "classes" in arch_info:
-                class_diagram = self._generate_class_diagram(arch_info["classes"])
-                diagrams["diagrams"].append({
-                    "type": "class",
-                    "path": self._save_diagram(class_diagram, "class")
-                })
+                planned.append(("class", self._generate_class_diagram(arch_info["classes"])))
                 
             # Generate sequence diagram
             if "sequences" in arch_info:
-                sequence_diagram = self._generate_sequence_diagram(arch_info["sequences"])
-                diagrams["diagrams"].append({
-                    "type": "sequence",
-                    "path": self._save_diagram(sequence_diagram, "sequence")
-                })
+                planned.append(("sequence", self._generate_sequence_diagram(arch_info["sequences"])))
                 
+            # Each render waits on its own dot subprocess, so run them side by side
+            with ThreadPoolExecutor(max_workers=max(len(planned), 1)) as executor:
+                futures = [
+                    (diagram_type, executor.submit(self._save_diagram, diagram, diagram_type))
+                    for diagram_type, diagram in planned
+                ]
+                for diagram_type, future in futures:
+                    diagrams["diagrams"].append({
+                        "type": diagram_type,
+                        "path": future.result()
+                    })
+                    
             return diagrams
             
         except Exception as e:
@@ -205,106 +360,151 @@ class DocumentationGenerator:
     
     def _analyze_api(self, source_dir: str) -> Dict[str, Any]:
         """Analyze API endpoints and models."""
-        api_info = {
-            "endpoints": [],
-            "models": []
+        info = self._analyze_all(source_dir)
+        return {
+            "endpoints": info["endpoints"],
+            "models": info["models"]
         }
-        
-        # Walk through the source directory
-        for root, _, files in os.walk(source_dir):
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = os.path.join(root, file)
-                    
-                    # Parse the file
-                    with open(file_path, 'r') as f:
-                        tree = ast.parse(f.read())
-                        
-                    # Find API endpoints
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.FunctionDef):
-                            # Check for FastAPI/Flask decorators
-                            if any(isinstance(d, ast.Call) and 
-                                  isinstance(d.func, ast.Name) and 
-                                  d.func.id in ['app.route', 'router.get', 'router.post'] 
-                                  for d in node.decorator_list):
-                                endpoint = {
-                                    "name": node.name,
-                                    "path": file_path,
-                                    "method": self._get_http_method(node),
-                                    "parameters": self._get_parameters(node),
-                                    "return_type": self._get_return_type(node),
-                                    "docstring": ast.get_docstring(node)
-                                }
-                                api_info["endpoints"].append(endpoint)
-                                
-                        elif isinstance(node, ast.ClassDef):
-                            # Check for Pydantic models
-                            if any(isinstance(b, ast.Name) and b.id == 'BaseModel' 
-                                  for b in node.bases):
-                                model = {
-                                    "name": node.name,
-                                    "path": file_path,
-                                    "fields": self._get_model_fields(node),
-                                    "docstring": ast.get_docstring(node)
-                                }
-                                api_info["models"].append(model)
-                                
-        return api_info
     
     def _analyze_code(self, source_dir: str) -> Dict[str, Any]:
         """Analyze code structure and content."""
-        code_info = {
+        info = self._analyze_all(source_dir)
+        return {
+            "modules": info["modules"],
+            "classes": info["classes"],
+            "functions": info["functions"]
+        }
+    
+    def _analyze_all(self, source_dir: str) -> Dict[str, Any]:
+        """Collect API, code and architecture info in a single pass over the source tree.
+
+        The result is reused until a file under source_dir is added,
+        removed or modified.
+        """
+        files = []
+        fingerprint = []
+        for entry in self._iter_py_files(source_dir):
+            stat = entry.stat()
+            files.append((entry.name, entry.path))
+            fingerprint.append((entry.path, stat.st_mtime_ns, stat.st_size))
+                    
+        cached = self._analysis_cache.get(source_dir)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+            
+        info = {
+            "endpoints": [],
+            "models": [],
             "modules": [],
             "classes": [],
-            "functions": []
+            "functions": [],
+            "components": [],
+            "sequences": []
         }
         
-        # Walk through the source directory
-        for root, _, files in os.walk(source_dir):
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = os.path.join(root, file)
-                    
-                    # Parse the file
-                    with open(file_path, 'r') as f:
-                        tree = ast.parse(f.read())
-                        
-                    # Get module info
-                    module = {
-                        "name": os.path.splitext(file)[0],
-                        "path": file_path,
-                        "docstring": ast.get_docstring(tree),
-                        "imports": self._get_imports(tree)
-                    }
-                    code_info["modules"].append(module)
+        trees = self._parse_files_parallel([file_path for _, file_path in files])
+        for file, file_path in files:
+            tree = trees[file_path]
+            
+            # Get module info
+            module = {
+                "name": os.path.splitext(file)[0],
+                "path": file_path,
+                "docstring": ast.get_docstring(tree),
+                "imports": self._get_imports(tree)
+            }
+            info["modules"].append(module)
+            
+            # Find components (modules with specific patterns)
+            component_type = self._get_component_type(file_path)
+            if component_type != "Component":
+                info["components"].append({
+                    "name": module["name"],
+                    "type": component_type,
+                    "path": file_path,
+                    "dependencies": module["imports"]
+                })
+                
+            # Find endpoints, models, classes, functions and sequences
+            _Collector(self, module, info).visit(tree)
                     
-                    # Find classes and functions
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.ClassDef):
-                            class_info = {
-                                "name": node.name,
-                                "module": module["name"],
-                                "path": file_path,
-                                "docstring": ast.get_docstring(node),
-                                "methods": self._get_class_methods(node),
-                                "attributes": self._get_class_attributes(node),
-                                "bases": [b.id for b in node.bases if isinstance(b, ast.Name)]
-                            }
-                            code_info["classes"].append(class_info)
-                            
-                        elif isinstance(node, ast.FunctionDef):
-                            func_info = {
-                                "name": node.name,
-                                "module": module["name"],
-                                "path": file_path,
-                                "docstring": ast.get_docstring(node),
-                                "parameters": self._get_parameters(node),
-                                "return_type": self._get_return_type(node)
-                            }
-                            code_info["functions"].append(func_info)
-                            
-        return code_info
+        self._analysis_cache[source_dir] = (fingerprint, info)
+        return info
+    
+    def _iter_py_files(self, root: str) -> Iterator[os.DirEntry]:
+        """Yield the .py files under root, skipping caches, VCS and virtualenv directories."""
+        stack = [root]
+        while stack:
+            subdirs = []
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        yield entry
+            # Visit subdirectories in listing order, like os.walk
+            stack.extend(reversed(subdirs))
+    
+    def _collect_function(self, node: ast.FunctionDef, module: Dict[str, Any], info: Dict[str, Any]):
+        """Record a function and, if it is a route handler, its endpoint."""
+        # Endpoint and function records describe the same node, so extract once
+        docstring = ast.get_docstring(node)
+        parameters = self._get_parameters(node)
+        return_type = self._get_return_type(node)
+        
+        # Check for FastAPI/Flask decorators
+        method = self._get_http_method(node)
+        if method:
+            info["endpoints"].append({
+                "name": node.name,
+                "path": module["path"],
+                "method": method,
+                "parameters": parameters,
+                "return_type": return_type,
+                "docstring": docstring
+            })
+            
+        info["functions"].append({
+            "name": node.name,
+            "module": module["name"],
+            "path": module["path"],
+            "docstring": docstring,
+            "parameters": parameters,
+            "return_type": return_type
+        })
+    
+    def _collect_class(self, node: ast.ClassDef, module: Dict[str, Any], info: Dict[str, Any]):
+        """Record a class, its sequences and, if it is a Pydantic model, the model."""
+        docstring = ast.get_docstring(node)
+        attributes = self._get_class_attributes(node)
+        bases = [b.id for b in node.bases if isinstance(b, ast.Name)]
+        
+        # Check for Pydantic models; their fields are the annotated attributes
+        if 'BaseModel' in bases:
+            info["models"].append({
+                "name": node.name,
+                "path": module["path"],
+                "fields": attributes,
+                "docstring": docstring
+            })
+            
+        info["classes"].append({
+            "name": node.name,
+            "module": module["name"],
+            "path": module["path"],
+            "docstring": docstring,
+            "methods": self._get_class_methods(node),
+            "attributes": attributes,
+            "bases": bases
+        })
+        
+        # Find sequence patterns
+        for method in node.body:
+            if isinstance(method, ast.FunctionDef):
+                sequence = self._analyze_sequence(method)
+                if sequence:
+                    info["sequences"].append(sequence)
     
     def _analyze_project(self, project_dir: str) -> Dict[str, Any]:
         """Analyze project structure and metadata."""
@@ -318,93 +518,47 @@ class DocumentationGenerator:
             "docs": []
         }
         
+        # One directory read answers every existence check below
+        with os.scandir(project_dir) as it:
+            entries = {entry.name: entry for entry in it}
+            
         # Read setup.py or pyproject.toml
-        setup_file = os.path.join(project_dir, "setup.py")
-        if os.path.exists(setup_file):
-            with open(setup_file, 'r') as f:
-                tree = ast.parse(f.read())
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'setup':
-                        for keyword in node.keywords:
-                            if keyword.arg == 'name':
-                                project_info["name"] = keyword.value.value
-                            elif keyword.arg == 'description':
-                                project_info["description"] = keyword.value.value
-                            elif keyword.arg == 'version':
-                                project_info["version"] = keyword.value.value
-                                
+        setup_entry = entries.get("setup.py")
+        if setup_entry and setup_entry.is_file():
+            tree = _parse_file(setup_entry.path)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'setup':
+                    for keyword in node.keywords:
+                        if keyword.arg == 'name':
+                            project_info["name"] = keyword.value.value
+                        elif keyword.arg == 'description':
+                            project_info["description"] = keyword.value.value
+                        elif keyword.arg == 'version':
+                            project_info["version"] = keyword.value.value
+                            
         # Find dependencies
-        req_file = os.path.join(project_dir, "requirements.txt")
-        if os.path.exists(req_file):
-            with open(req_file, 'r') as f:
+        req_entry = entries.get("requirements.txt")
+        if req_entry and req_entry.is_file():
+            with open(req_entry.path, 'r') as f:
                 project_info["dependencies"] = [line.strip() for line in f if line.strip()]
                 
-        # Find scripts
-        scripts_dir = os.path.join(project_dir, "scripts")
-        if os.path.exists(scripts_dir):
-            project_info["scripts"] = [f for f in os.listdir(scripts_dir) if f.endswith(".py")]
-            
-        # Find tests
-        tests_dir = os.path.join(project_dir, "tests")
-        if os.path.exists(tests_dir):
-            project_info["tests"] = [f for f in os.listdir(tests_dir) if f.endswith(".py")]
-            
-        # Find docs
-        docs_dir = os.path.join(project_dir, "docs")
-        if os.path.exists(docs_dir):
-            project_info["docs"] = [f for f in os.listdir(docs_dir) if f.endswith((".md", ".rst"))]
-            
+        # Find scripts, tests and docs
+        for key, suffixes in (("scripts", ".py"), ("tests", ".py"), ("docs", (".md", ".rst"))):
+            dir_entry = entries.get(key)
+            if dir_entry and dir_entry.is_dir():
+                with os.scandir(dir_entry.path) as it:
+                    project_info[key] = [entry.name for entry in it if entry.name.endswith(suffixes)]
+                    
         return project_info
     
     def _analyze_architecture(self, source_dir: str) -> Dict[str, Any]:
         """Analyze system architecture."""
-        arch_info = {
-            "components": [],
-            "classes": [],
-            "sequences": []
+        info = self._analyze_all(source_dir)
+        return {
+            "components": info["components"],
+            "classes": info["classes"],
+            "sequences": info["sequences"]
         }
-        
-        # Walk through the source directory
-        for root, _, files in os.walk(source_dir):
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = os.path.join(root, file)
-                    
-                    # Parse the file
-                    with open(file_path, 'r') as f:
-                        tree = ast.parse(f.read())
-                        
-                    # Find components (modules with specific patterns)
-                    if any(pattern in file_path for pattern in ["api", "service", "model", "controller"]):
-                        component = {
-                            "name": os.path.splitext(file)[0],
-                            "type": self._get_component_type(file_path),
-                            "path": file_path,
-                            "dependencies": self._get_imports(tree)
-                        }
-                        arch_info["components"].append(component)
-                        
-                    # Find classes
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.ClassDef):
-                            class_info = {
-                                "name": node.name,
-                                "module": os.path.splitext(file)[0],
-                                "path": file_path,
-                                "methods": self._get_class_methods(node),
-                                "attributes": self._get_class_attributes(node),
-                                "bases": [b.id for b in node.bases if isinstance(b, ast.Name)]
-                            }
-                            arch_info["classes"].append(class_info)
-                            
-                            # Find sequence patterns
-                            for method in node.body:
-                                if isinstance(method, ast.FunctionDef):
-                                    sequence = self._analyze_sequence(method)
-                                    if sequence:
-                                        arch_info["sequences"].append(sequence)
-                                        
-        return arch_info
     
     def _document_endpoint(self, endpoint: Dict[str, Any]) -> Dict[str, Any]:
         """Generate documentation for an API endpoint."""
@@ -461,57 +615,58 @@ class DocumentationGenerator:
     
     def _generate_doc_suggestions(self, code_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate documentation improvement suggestions."""
-        suggestions = []
-        
         # Check for missing docstrings
-        for module in code_info["modules"]:
-            if not module["docstring"]:
-                suggestions.append({
-                    "type": "missing_docstring",
-                    "element": "module",
-                    "name": module["name"],
-                    "path": module["path"],
-                    "suggestion": "Add a module-level docstring explaining the module's purpose and contents."
-                })
-                
-        for class_info in code_info["classes"]:
-            if not class_info["docstring"]:
-                suggestions.append({
-                    "type": "missing_docstring",
-                    "element": "class",
-                    "name": class_info["name"],
-                    "path": class_info["path"],
-                    "suggestion": "Add a class-level docstring explaining the class's purpose and usage."
-                })
-                
-        for func in code_info["functions"]:
-            if not func["docstring"]:
-                suggestions.append({
-                    "type": "missing_docstring",
-                    "element": "function",
-                    "name": func["name"],
-                    "path": func["path"],
-                    "suggestion": "Add a function-level docstring explaining the function's purpose, parameters, and return value."
-                })
-                
+        suggestions = [
+            {
+                "type": "missing_docstring",
+                "element": "module",
+                "name": module["name"],
+                "path": module["path"],
+                "suggestion": "Add a module-level docstring explaining the module's purpose and contents."
+            }
+            for module in code_info["modules"] if not module["docstring"]
+        ]
+        suggestions.extend(
+            {
+                "type": "missing_docstring",
+                "element": "class",
+                "name": class_info["name"],
+                "path": class_info["path"],
+                "suggestion": "Add a class-level docstring explaining the class's purpose and usage."
+            }
+            for class_info in code_info["classes"] if not class_info["docstring"]
+        )
+        suggestions.extend(
+            {
+                "type": "missing_docstring",
+                "element": "function",
+                "name": func["name"],
+                "path": func["path"],
+                "suggestion": "Add a function-level docstring explaining the function's purpose, parameters, and return value."
+            }
+            for func in code_info["functions"] if not func["docstring"]
+        )
+        
         # Check for incomplete parameter documentation
         for func in code_info["functions"]:
             if func["docstring"]:
                 doc_params = self._extract_docstring_params(func["docstring"])
-                for param in func["parameters"]:
-                    if param not in doc_params:
-                        suggestions.append({
-                            "type": "incomplete_docstring",
-                            "element": "function",
-                            "name": func["name"],
-                            "path": func["path"],
-                            "suggestion": f"Add documentation for parameter '{param}' in the function's docstring."
-                        })
-                        
+                suggestions.extend(
+                    {
+                        "type": "incomplete_docstring",
+                        "element": "function",
+                        "name": func["name"],
+                        "path": func["path"],
+                        "suggestion": f"Add documentation for parameter '{param['name']}' in the function's docstring."
+                    }
+                    for param in func["parameters"] if param["name"] not in doc_params
+                )
+                
         return suggestions
     
-    def _generate_component_diagram(self, components: List[Dict[str, Any]]) -> graphviz.Digraph:
+    def _generate_component_diagram(self, components: List[Dict[str, Any]]) -> "graphviz.Digraph":
         """Generate a component diagram."""
+        import graphviz
         dot = graphviz.Digraph(comment='Component Diagram')
         dot.attr(rankdir='LR')
         
@@ -522,50 +677,53 @@ class DocumentationGenerator:
                     shape='box')
             
         # Add dependencies
+        names = {c["name"] for c in components}
         for component in components:
             for dep in component["dependencies"]:
-                if any(c["name"] == dep for c in components):
+                if dep in names:
                     dot.edge(component["name"], dep)
                     
         return dot
     
-    def _generate_class_diagram(self, classes: List[Dict[str, Any]]) -> graphviz.Digraph:
+    def _generate_class_diagram(self, classes: List[Dict[str, Any]]) -> "graphviz.Digraph":
         """Generate a class diagram."""
+        import graphviz
         dot = graphviz.Digraph(comment='Class Diagram')
         dot.attr(rankdir='BT')
         
         # Add classes
         for class_info in classes:
             # Create class label
-            label = f"{class_info['name']}"
+            parts = [class_info['name']]
             if class_info["bases"]:
-                label += f"\nInherits: {', '.join(class_info['bases'])}"
-            label += "\n\n"
+                parts.append(f"\nInherits: {', '.join(class_info['bases'])}")
+            parts.append("\n\n")
             
             # Add attributes
             if class_info["attributes"]:
-                label += "Attributes:\n"
-                for attr in class_info["attributes"]:
-                    label += f"- {attr}\n"
-                    
+                parts.append("Attributes:\n")
+                parts.extend(f"- {attr}\n" for attr in class_info["attributes"])
+                
             # Add methods
             if class_info["methods"]:
-                label += "\nMethods:\n"
-                for method in class_info["methods"]:
-                    label += f"- {method}\n"
-                    
+                parts.append("\nMethods:\n")
+                parts.extend(f"- {method}\n" for method in class_info["methods"])
+                
+            label = "".join(parts)
             dot.node(class_info["name"], label, shape='record')
             
         # Add inheritance relationships
+        names = {c["name"] for c in classes}
         for class_info in classes:
             for base in class_info["bases"]:
-                if any(c["name"] == base for c in classes):
+                if base in names:
                     dot.edge(class_info["name"], base)
                     
         return dot
     
-    def _generate_sequence_diagram(self, sequences: List[Dict[str, Any]]) -> graphviz.Digraph:
+    def _generate_sequence_diagram(self, sequences: List[Dict[str, Any]]) -> "graphviz.Digraph":
         """Generate a sequence diagram."""
+        import graphviz
         dot = graphviz.Digraph(comment='Sequence Diagram')
         dot.attr(rankdir='TB')
         
@@ -593,73 +751,144 @@ class DocumentationGenerator:
         
         # Save as JSON
         json_path = os.path.join(self.config.output_dir, f"{doc_type}_docs.json")
-        with open(json_path, 'w') as f:
-            json.dump(docs, f, indent=2)
+        with open(json_path, 'wb') as f:
+            f.write(json_dumps_indented(docs))
             
         # Convert to markdown
         md_path = os.path.join(self.config.output_dir, f"{doc_type}_docs.md")
+        parts = [
+            f"# {docs['title']}\n\n",
+            f"Generated: {docs['timestamp']}\n\n"
+        ]
+        if doc_type == "api":
+            self._write_api_markdown(docs, parts)
+        elif doc_type == "code":
+            self._write_code_markdown(docs, parts)
+            
+        md_content = "".join(parts)
         with open(md_path, 'w') as f:
-            f.write(f"# {docs['title']}\n\n")
-            f.write(f"Generated: {docs['timestamp']}\n\n")
+            f.write(md_content)
             
-            if doc_type == "api":
-                self._write_api_markdown(docs, f)
-            elif doc_type == "code":
-                self._write_code_markdown(docs, f)
-                
         # Convert to HTML if requested
         if self.config.format == "html":
             html_path = os.path.join(self.config.output_dir, f"{doc_type}_docs.html")
-            with open(md_path, 'r') as f:
-                md_content = f.read()
-                html_content = markdown.markdown(md_content)
-                with open(html_path, 'w') as h:
-                    h.write(html_content)
+            with open(html_path, 'w') as f:
+                f.write(_markdown_converter().reset().convert(md_content))
     
     def _save_readme(self, readme: Dict[str, Any], project_dir: str):
         """Save README file."""
         readme_path = os.path.join(project_dir, "README.md")
         
-        with open(readme_path, 'w') as f:
-            f.write(f"# {readme['title']}\n\n")
-            f.write(f"{readme['description']}\n\n")
-            f.write(f"Version: {readme['version']}\n\n")
+        parts = [
+            f"# {readme['title']}\n\n",
+            f"{readme['description']}\n\n",
+            f"Version: {readme['version']}\n\n"
+        ]
+        for section in readme["sections"]:
+            parts.append(f"## {section['title']}\n\n{section['content']}\n\n")
             
-            for section in readme["sections"]:
-                f.write(f"## {section['title']}\n\n")
-                f.write(f"{section['content']}\n\n")
+        with open(readme_path, 'w') as f:
+            f.write("".join(parts))
     
-    def _save_diagram(self, diagram: graphviz.Digraph, diagram_type: str) -> str:
+    def _save_diagram(self, diagram: "graphviz.Digraph", diagram_type: str) -> str:
         """Save a diagram to a file."""
         # Create output directory
         os.makedirs(self.config.output_dir, exist_ok=True)
         
-        # Save diagram
         output_path = os.path.join(self.config.output_dir, f"{diagram_type}_diagram")
-        diagram.render(output_path, format='png', cleanup=True)
-        
-        return f"{output_path}.png"
+        png_path = f"{output_path}.png"
+        cache_dir = self.config.diagram_cache_dir
+        if not cache_dir:
+            self._render_png(diagram, output_path)
+            return png_path
+            
+        # Identical DOT source always renders to the same image
+        key = hashlib.sha1(diagram.source.encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{key}.png")
+        if os.path.exists(cache_path):
+            shutil.copyfile(cache_path, png_path)
+            return png_path
+            
+        # Save diagram
+        self._render_png(diagram, output_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(png_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+            
+        return png_path
+    
+    def _render_png(self, diagram: "graphviz.Digraph", output_path: str):
+        """Render a diagram to output_path.png, in-process when pygraphviz is available."""
+        try:
+            import pygraphviz
+        except ImportError:
+            diagram.render(output_path, format='png', cleanup=True)
+            return
+            
+        # libgvc is not thread-safe and diagrams may be saved concurrently
+        with _GVC_LOCK:
+            graph = pygraphviz.AGraph(string=diagram.source)
+            graph.draw(f"{output_path}.png", format='png', prog='dot')
     
     def _get_version(self) -> str:
         """Get the current version of the project."""
         try:
-            with open("setup.py", 'r') as f:
-                tree = ast.parse(f.read())
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'setup':
-                        for keyword in node.keywords:
-                            if keyword.arg == 'version':
-                                return keyword.value.value
+            tree = _parse_file("setup.py")
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'setup':
+                    for keyword in node.keywords:
+                        if keyword.arg == 'version':
+                            return keyword.value.value
         except:
             pass
         return "0.1.0"
     
-    def _get_http_method(self, node: ast.FunctionDef) -> str:
-        """Get the HTTP method from a function's decorators."""
+    def _parse_files_parallel(self, paths: List[str]) -> Dict[str, ast.Module]:
+        """Parse many Python files across worker processes."""
+        cache_dir = self.config.ast_cache_dir
+        if len(paths) < PARALLEL_PARSE_MIN_FILES:
+            return dict(_parse_one(path, cache_dir) for path in paths)
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(_parse_one, path, cache_dir) for path in paths]
+            return dict(future.result() for future in as_completed(futures))
+    
+    def _get_http_method(self, node: ast.FunctionDef) -> Optional[str]:
+        """Get the HTTP method from a function's route decorator, or None if it has none."""
         for decorator in node.decorator_list:
             if isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute):
-                if decorator.func.attr in ['get', 'post', 'put', 'delete', 'patch']:
-                    return decorator.func.attr.upper()
+                attr = decorator.func.attr
+                # The path tells a route from other calls like @mock.patch("os.path")
+                if attr in _ROUTE_ATTRS and self._is_route_path(decorator):
+                    return self._get_route_methods(decorator) if attr == "route" else attr.upper()
+        return None
+    
+    def _is_route_path(self, decorator: ast.Call) -> bool:
+        """Tell whether a decorator call's path argument looks like a URL rule."""
+        if decorator.args:
+            path = decorator.args[0]
+        else:
+            path = next((keyword.value for keyword in decorator.keywords if keyword.arg in ('path', 'rule')), None)
+        # FastAPI routers also accept "" for the prefix itself
+        return (
+            isinstance(path, ast.Constant) and isinstance(path.value, str)
+            and (path.value.startswith('/') or path.value == '')
+        )
+    
+    def _get_route_methods(self, decorator: ast.Call) -> str:
+        """Get the methods a Flask-style @route(..., methods=[...]) accepts; GET when not given."""
+        for keyword in decorator.keywords:
+            if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple, ast.Set)):
+                methods = [
+                    element.value.upper() for element in keyword.value.elts
+                    if isinstance(element, ast.Constant) and isinstance(element.value, str)
+                ]
+                if methods:
+                    return ", ".join(methods)
         return "GET"
     
     def _get_parameters(self, node: ast.FunctionDef) -> List[Dict[str, Any]]:
@@ -689,29 +918,29 @@ class DocumentationGenerator:
                 return f"{annotation.value.id}[{self._get_annotation_type(annotation.slice)}]"
         return str(annotation)
     
-    def _get_model_fields(self, node: ast.ClassDef) -> List[Dict[str, Any]]:
-        """Get Pydantic model fields."""
-        fields = []
-        for item in node.body:
-            if isinstance(item, ast.AnnAssign):
-                field = {
-                    "name": item.target.id,
-                    "type": self._get_annotation_type(item.annotation),
-                    "default": None
-                }
-                fields.append(field)
-        return fields
-    
-    def _get_imports(self, tree: ast.AST) -> List[str]:
-        """Get all imports from a module."""
+    def _get_imports(self, tree: ast.Module) -> List[str]:
+        """Get all imports from a module.
+
+        Only module-level statements are scanned, including those guarded by
+        ``if TYPE_CHECKING:`` or ``try:`` blocks; imports inside functions
+        are not module dependencies.
+        """
         imports = []
-        for node in ast.walk(tree):
+        stack = list(reversed(tree.body))
+        while stack:
+            node = stack.pop()
             if isinstance(node, ast.Import):
                 for name in node.names:
                     imports.append(name.name)
             elif isinstance(node, ast.ImportFrom):
                 for name in node.names:
                     imports.append(f"{node.module}.{name.name}")
+            elif isinstance(node, ast.If) and _is_type_checking(node.test):
+                stack.extend(reversed(node.body))
+            elif isinstance(node, ast.Try):
+                for handler in reversed(node.handlers):
+                    stack.extend(reversed(handler.body))
+                stack.extend(reversed(node.body))
         return imports
     
     def _get_class_methods(self, node: ast.ClassDef) -> List[Dict[str, Any]]:
@@ -730,19 +959,20 @@ class DocumentationGenerator:
     
     def _get_class_attributes(self, node: ast.ClassDef) -> List[Dict[str, Any]]:
         """Get class attributes with their types."""
-        attributes = []
-        for item in node.body:
-            if isinstance(item, ast.AnnAssign):
-                attribute = {
-                    "name": item.target.id,
-                    "type": self._get_annotation_type(item.annotation),
-                    "default": None
-                }
-                attributes.append(attribute)
-        return attributes
+        # Only plain names declare attributes; `a.b: int` annotates some other object
+        return [
+            {
+                "name": item.target.id,
+                "type": self._get_annotation_type(item.annotation),
+                "default": None
+            }
+            for item in node.body
+            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name)
+        ]
     
     def _get_component_type(self, file_path: str) -> str:
         """Determine the type of a component from its path."""
+        # Plain substring tests beat both a regex alternation and a lookup table here
         if "api" in file_path:
             return "API"
         elif "service" in file_path:
@@ -761,146 +991,116 @@ class DocumentationGenerator:
             "interactions": []
         }
         
-        for item in ast.walk(node):
+        add_participant = sequence["participants"].add
+        add_interaction = sequence["interactions"].append
+        
+        # Depth-first over the body in source order; decorators, defaults
+        # and nested scopes do not run as part of this call
+        stack = list(reversed(node.body))
+        while stack:
+            item = stack.pop()
+            if isinstance(item, _SEQUENCE_SKIP):
+                continue
             if isinstance(item, ast.Call):
-                if isinstance(item.func, ast.Attribute):
-                    # Method call
-                    if isinstance(item.func.value, ast.Name):
-                        sequence["participants"].add(item.func.value.id)
-                        sequence["interactions"].append({
-                            "from": "self",
-                            "to": item.func.value.id,
-                            "message": f"{item.func.attr}()"
-                        })
-                        
+                func = item.func
+                # Method call
+                if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+                    add_participant(func.value.id)
+                    add_interaction({
+                        "from": "self",
+                        "to": func.value.id,
+                        "message": f"{func.attr}()"
+                    })
+            stack.extend(reversed([
+                child for child in ast.iter_child_nodes(item)
+                if not isinstance(child, _SEQUENCE_LEAVES)
+            ]))
+            
         if sequence["interactions"]:
             sequence["participants"] = list(sequence["participants"])
             return sequence
         return None
     
-    def _extract_docstring_params(self, docstring: str) -> List[str]:
+    def _extract_docstring_params(self, docstring: str) -> Tuple[str, ...]:
         """Extract parameter names from a docstring."""
-        params = []
-        if docstring:
-            # Look for :param: or :param name: patterns
-            param_pattern = r":param\s+(\w+):"
-            params = re.findall(param_pattern, docstring)
-        return params
+        if not docstring:
+            return ()
+        return _docstring_params(docstring)
     
-    def _write_api_markdown(self, docs: Dict[str, Any], file):
+    def _append_examples(self, parts: List[str], examples: List[str]):
+        """Append an Examples section with one fenced block per example."""
+        if examples:
+            parts.append("#### Examples\n\n")
+            parts.extend(f"```python\n{example}\n```\n\n" for example in examples)
+    
+    def _append_typed_names(self, parts: List[str], heading: str, items: List[Dict[str, Any]]):
+        """Append a heading followed by one `name`: type bullet per item."""
+        if items:
+            parts.append(heading)
+            parts.extend(f"- `{item['name']}`: {item['type']}\n" for item in items)
+            parts.append("\n")
+    
+    def _write_api_markdown(self, docs: Dict[str, Any], parts: List[str]):
         """Write API documentation in markdown format."""
         # Write endpoints
-        file.write("## Endpoints\n\n")
+        parts.append("## Endpoints\n\n")
         for endpoint in docs["endpoints"]:
-            file.write(f"### {endpoint['method']} {endpoint['name']}\n\n")
-            file.write(f"{endpoint['description']}\n\n")
-            
-            if endpoint["parameters"]:
-                file.write("#### Parameters\n\n")
-                for param in endpoint["parameters"]:
-                    file.write(f"- `{param['name']}`: {param['type']}\n")
-                file.write("\n")
-                
+            parts.append(f"### {endpoint['method']} {endpoint['name']}\n\n{endpoint['description']}\n\n")
+            self._append_typed_names(parts, "#### Parameters\n\n", endpoint["parameters"])
             if endpoint["return_type"]:
-                file.write(f"#### Returns\n\n`{endpoint['return_type']}`\n\n")
-                
-            if endpoint["examples"]:
-                file.write("#### Examples\n\n")
-                for example in endpoint["examples"]:
-                    file.write(f"```python\n{example}\n```\n\n")
+                parts.append(f"#### Returns\n\n`{endpoint['return_type']}`\n\n")
+            self._append_examples(parts, endpoint["examples"])
                     
         # Write models
-        file.write("## Models\n\n")
+        parts.append("## Models\n\n")
         for model in docs["models"]:
-            file.write(f"### {model['name']}\n\n")
-            file.write(f"{model['description']}\n\n")
-            
-            if model["fields"]:
-                file.write("#### Fields\n\n")
-                for field in model["fields"]:
-                    file.write(f"- `{field['name']}`: {field['type']}\n")
-                file.write("\n")
-                
-            if model["examples"]:
-                file.write("#### Examples\n\n")
-                for example in model["examples"]:
-                    file.write(f"```python\n{example}\n```\n\n")
+            parts.append(f"### {model['name']}\n\n{model['description']}\n\n")
+            self._append_typed_names(parts, "#### Fields\n\n", model["fields"])
+            self._append_examples(parts, model["examples"])
     
-    def _write_code_markdown(self, docs: Dict[str, Any], file):
+    def _write_code_markdown(self, docs: Dict[str, Any], parts: List[str]):
         """Write code documentation in markdown format."""
         # Write modules
-        file.write("## Modules\n\n")
+        parts.append("## Modules\n\n")
         for module in docs["modules"]:
-            file.write(f"### {module['name']}\n\n")
-            file.write(f"{module['description']}\n\n")
-            
+            parts.append(f"### {module['name']}\n\n{module['description']}\n\n")
             if module["imports"]:
-                file.write("#### Imports\n\n")
-                for imp in module["imports"]:
-                    file.write(f"- `{imp}`\n")
-                file.write("\n")
-                
+                parts.append("#### Imports\n\n")
+                parts.extend(f"- `{imp}`\n" for imp in module["imports"])
+                parts.append("\n")
             if "usage" in module:
-                file.write("#### Usage\n\n")
-                file.write(f"{module['usage']}\n\n")
+                parts.append(f"#### Usage\n\n{module['usage']}\n\n")
                 
         # Write classes
-        file.write("## Classes\n\n")
+        parts.append("## Classes\n\n")
         for class_info in docs["classes"]:
-            file.write(f"### {class_info['name']}\n\n")
-            file.write(f"{class_info['description']}\n\n")
-            
-            if class_info["attributes"]:
-                file.write("#### Attributes\n\n")
-                for attr in class_info["attributes"]:
-                    file.write(f"- `{attr['name']}`: {attr['type']}\n")
-                file.write("\n")
-                
+            parts.append(f"### {class_info['name']}\n\n{class_info['description']}\n\n")
+            self._append_typed_names(parts, "#### Attributes\n\n", class_info["attributes"])
             if class_info["methods"]:
-                file.write("#### Methods\n\n")
+                parts.append("#### Methods\n\n")
                 for method in class_info["methods"]:
-                    file.write(f"##### {method['name']}\n\n")
-                    file.write(f"{method['docstring']}\n\n")
-                    
-                    if method["parameters"]:
-                        file.write("Parameters:\n")
-                        for param in method["parameters"]:
-                            file.write(f"- `{param['name']}`: {param['type']}\n")
-                        file.write("\n")
-                        
+                    parts.append(f"##### {method['name']}\n\n{method['docstring']}\n\n")
+                    self._append_typed_names(parts, "Parameters:\n", method["parameters"])
                     if method["return_type"]:
-                        file.write(f"Returns: `{method['return_type']}`\n\n")
-                        
-            if class_info["examples"]:
-                file.write("#### Examples\n\n")
-                for example in class_info["examples"]:
-                    file.write(f"```python\n{example}\n```\n\n")
+                        parts.append(f"Returns: `{method['return_type']}`\n\n")
+            self._append_examples(parts, class_info["examples"])
                     
         # Write functions
-        file.write("## Functions\n\n")
+        parts.append("## Functions\n\n")
         for func in docs["functions"]:
-            file.write(f"### {func['name']}\n\n")
-            file.write(f"{func['description']}\n\n")
-            
-            if func["parameters"]:
-                file.write("#### Parameters\n\n")
-                for param in func["parameters"]:
-                    file.write(f"- `{param['name']}`: {param['type']}\n")
-                file.write("\n")
-                
+            parts.append(f"### {func['name']}\n\n{func['description']}\n\n")
+            self._append_typed_names(parts, "#### Parameters\n\n", func["parameters"])
             if func["return_type"]:
-                file.write(f"#### Returns\n\n`{func['return_type']}`\n\n")
-                
-            if func["examples"]:
-                file.write("#### Examples\n\n")
-                for example in func["examples"]:
-                    file.write(f"```python\n{example}\n```\n\n")
+                parts.append(f"#### Returns\n\n`{func['return_type']}`\n\n")
+            self._append_examples(parts, func["examples"])
                     
         # Write suggestions
         if docs["suggestions"]:
-            file.write("## Documentation Suggestions\n\n")
-            for suggestion in docs["suggestions"]:
-                file.write(f"### {suggestion['element'].title()}: {suggestion['name']}\n\n")
-                file.write(f"**Issue**: {suggestion['type']}\n\n")
-                file.write(f"**Suggestion**: {suggestion['suggestion']}\n\n")
-                file.write(f"**Location**: {suggestion['path']}\n\n") 
\ No newline at end of file
+            parts.append("## Documentation Suggestions\n\n")
+            parts.extend(
+                f"### {suggestion['element'].title()}: {suggestion['name']}\n\n"
+                f"**Issue**: {suggestion['type']}\n\n"
+                f"**Suggestion**: {suggestion['suggestion']}\n\n"
+                f"**Location**: {suggestion['path']}\n\n"
+                for suggestion in docs["suggestions"]
+            )
\ No newline at end of file
@@ -1,24 +1,31 @@
+import errno
 import os
 import shutil
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 import requests
 from datetime import datetime
 
-@dataclass
-class FileInfo:
-    path: str
-    name: str
-    extension: str
-    size: int
-    last_modified: datetime
-    type: str  # file, directory
-    content_type: Optional[str]  # For files: text, binary, image, etc.
-    category: Optional[str]  # Determined by AI analysis
+try:
+    import orjson
+    json_loads = orjson.loads
+    
+    def json_dumps_indented(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+# (connect, read) seconds for Ollama requests; with streaming the read timeout
+# bounds the gap between chunks rather than the whole generation
+OLLAMA_TIMEOUT = (3.05, 120)
 
-@dataclass
+@dataclass(slots=True)
 class OrganizationPlan:
     current_structure: Dict[str, Any]
     suggested_structure: Dict[str, Any]
@@ -43,92 +50,129 @@ class FileOrganizer:
             'executable': ['.exe', '.msi', '.app', '.dmg'],
             'config': ['.json', '.yaml', '.yml', '.xml', '.ini', '.conf', '.toml']
         }
+        # Reuses the keep-alive connection to Ollama across planning calls
+        self._http = requests.Session()
+        # Inverted once so each lookup is a single dict hit
+        self._ext_to_type = {
+            ext: content_type
+            for content_type, extensions in self.content_types.items()
+            for ext in extensions
+        }
+    
+    def close(self):
+        """Release pooled HTTP connections."""
+        self._http.close()
     
     def analyze_directory(self, directory: str) -> Dict[str, Any]:
         """Analyze a directory structure and its contents."""
         try:
-            file_info_list = []
-            total_size = 0
-            file_count = 0
-            dir_count = 0
-            
-            for root, dirs, files in os.walk(directory):
-                # Analyze directories
-                for dir_name in dirs:
-                    dir_path = os.path.join(root, dir_name)
-                    dir_info = FileInfo(
-                        path=dir_path,
-                        name=dir_name,
-                        extension='',
-                        size=0,
-                        last_modified=datetime.fromtimestamp(os.path.getmtime(dir_path)),
-                        type='directory',
-                        content_type=None,
-                        category=None
-                    )
-                    file_info_list.append(dir_info)
-                    dir_count += 1
-                
-                # Analyze files
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    try:
-                        size = os.path.getsize(file_path)
-                        extension = os.path.splitext(file_name)[1].lower()
-                        
-                        file_info = FileInfo(
-                            path=file_path,
-                            name=file_name,
-                            extension=extension,
-                            size=size,
-                            last_modified=datetime.fromtimestamp(os.path.getmtime(file_path)),
-                            type='file',
-                            content_type=self._get_content_type(extension),
-                            category=None
-                        )
-                        file_info_list.append(file_info)
-                        total_size += size
-                        file_count += 1
-                    except Exception as e:
-                        print(f"Error analyzing file {file_path}: {str(e)}")
+            dirs, files = self._list_dir(directory)
+            parts = [self._analyze_entries([(entry, True) for entry in dirs] + [(entry, False) for entry in files])]
             
+            # Like os.walk, list symlinked directories but do not descend into them
+            subtrees = [entry.path for entry in dirs if not entry.is_symlink()]
+            if len(subtrees) < 2:
+                parts.extend(self._analyze_entries(self._scan(path)) for path in subtrees)
+            else:
+                # stat and readdir release the GIL, so subtrees can be walked side by side
+                max_workers = min(32, (os.cpu_count() or 1) * 4, len(subtrees))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    parts.extend(executor.map(lambda path: self._analyze_entries(self._scan(path)), subtrees))
+                    
             return {
                 "directory": directory,
-                "total_size": total_size,
-                "file_count": file_count,
-                "dir_count": dir_count,
-                "files": [self._file_info_to_dict(f) for f in file_info_list]
+                "total_size": sum(part[1] for part in parts),
+                "file_count": sum(part[2] for part in parts),
+                "dir_count": sum(part[3] for part in parts),
+                "files": [record for part in parts for record in part[0]]
             }
             
         except Exception as e:
             return {"error": str(e)}
     
-    def _get_content_type(self, extension: str) -> Optional[str]:
-        """Determine the content type based on file extension."""
-        for content_type, extensions in self.content_types.items():
-            if extension in extensions:
-                return content_type
-        return None
+    def _analyze_entries(self, entries: Iterable[Tuple[os.DirEntry, bool]]) -> Tuple[List[Dict[str, Any]], int, int, int]:
+        """Build the analysis records for (entry, is_dir) pairs.
+
+        Returns the records with their total file size, file count and
+        directory count.
+        """
+        records = []
+        file_count = 0
+        dir_count = 0
+        
+        for entry, is_dir in entries:
+            try:
+                # One stat per entry serves both size and mtime
+                records.append(self._build_entry_dict(entry, entry.stat(), is_dir))
+                if is_dir:
+                    dir_count += 1
+                else:
+                    file_count += 1
+            except Exception as e:
+                print(f"Error analyzing file {entry.path}: {str(e)}")
+                
+        # Directories carry size 0, so one C-level sum covers the files
+        total_size = sum(record["size"] for record in records)
+        return records, total_size, file_count, dir_count
     
-    def _file_info_to_dict(self, file_info: FileInfo) -> Dict[str, Any]:
-        """Convert FileInfo object to dictionary."""
+    def _build_entry_dict(self, entry: os.DirEntry, stat: os.stat_result, is_dir: bool) -> Dict[str, Any]:
+        """Describe a directory entry as an analysis record; category is left for the AI."""
+        if is_dir:
+            extension = ''
+            content_type = None
+        else:
+            extension = os.path.splitext(entry.name)[1].lower()
+            content_type = self._get_content_type(extension)
         return {
-            "path": file_info.path,
-            "name": file_info.name,
-            "extension": file_info.extension,
-            "size": file_info.size,
-            "last_modified": file_info.last_modified.isoformat(),
-            "type": file_info.type,
-            "content_type": file_info.content_type,
-            "category": file_info.category
+            "path": entry.path,
+            "name": entry.name,
+            "extension": extension,
+            "size": 0 if is_dir else stat.st_size,
+            "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "type": 'directory' if is_dir else 'file',
+            "content_type": content_type,
+            "category": None
         }
     
+    def _list_dir(self, directory: str) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+        """Split a directory's entries into subdirectories and files."""
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            # os.walk skips unreadable directories as well
+            return [], []
+        dirs = []
+        files = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            (dirs if is_dir else files).append(entry)
+        return dirs, files
+    
+    def _scan(self, directory: str) -> Iterator[Tuple[os.DirEntry, bool]]:
+        """Yield (entry, is_dir) for everything under directory in os.walk order."""
+        stack = [directory]
+        while stack:
+            dirs, files = self._list_dir(stack.pop())
+            for entry in dirs:
+                yield entry, True
+            for entry in files:
+                yield entry, False
+            stack.extend(reversed([entry.path for entry in dirs if not entry.is_symlink()]))
+    
+    def _get_content_type(self, extension: str) -> Optional[str]:
+        """Determine the content type based on a lower-cased file extension."""
+        return self._ext_to_type.get(extension)
+    
     def get_organization_plan(self, analysis: Dict[str, Any]) -> OrganizationPlan:
         """Get AI-driven organization plan for the directory."""
         try:
             # Prepare context for AI
             context = f"""I'm analyzing a directory with the following structure:
-{json.dumps(analysis, indent=2)}
+{json_dumps_indented(analysis)}
 
 Please suggest:
 1. A logical directory structure
@@ -144,19 +188,7 @@ Consider:
 - Maintainability"""
 
             # Get AI suggestions
-            response = requests.post(
-                f"{self.settings.get('ollama.base_url')}/api/generate",
-                json={
-                    "model": self.settings.get("ollama.models.text"),
-                    "prompt": context,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Error getting AI response: {response.status_code}")
-            
-            ai_suggestions = response.json().get("response", "")
+            ai_suggestions = self._generate(context)
             
             # Parse AI suggestions into structured plan
             plan = self._parse_ai_suggestions(ai_suggestions, analysis)
@@ -166,6 +198,34 @@ Consider:
         except Exception as e:
             raise Exception(f"Error generating organization plan: {str(e)}")
     
+    def _generate(self, prompt: str) -> str:
+        """Stream a completion from Ollama, joining the response chunks as they arrive."""
+        with self._http.post(
+            f"{self.settings.get('ollama.base_url')}/api/generate",
+            json={
+                "model": self.settings.get("ollama.models.text"),
+                "prompt": prompt,
+                "stream": True
+            },
+            timeout=OLLAMA_TIMEOUT,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Error getting AI response: {response.status_code}")
+                
+            # Each line is one NDJSON chunk; the last one carries done=true
+            text_parts = []
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json_loads(line)
+                if "error" in chunk:
+                    raise Exception(f"Error getting AI response: {chunk['error']}")
+                text_parts.append(chunk.get("response", ""))
+                if chunk.get("done"):
+                    break
+        return "".join(text_parts)
+    
     def _parse_ai_suggestions(self, suggestions: str, analysis: Dict[str, Any]) -> OrganizationPlan:
         """Parse AI suggestions into a structured organization plan."""
         # This is a simplified version - in practice, you'd want more sophisticated parsing
@@ -214,13 +274,16 @@ Consider:
             "moves": moves
         }
         
-        # Organize files into categories
-        for file_info in analysis["files"]:
-            for category, patterns in categories.items():
-                if any(pattern in file_info["path"].lower() for pattern in patterns):
-                    if category not in structure["categories"]:
-                        structure["categories"][category] = []
-                    structure["categories"][category].append(file_info)
+        # Categories without patterns can never match
+        matchable = [(category, patterns) for category, patterns in categories.items() if patterns]
+        
+        # Organize files into categories, lower-casing each path once
+        if matchable:
+            for file_info in analysis["files"]:
+                path = file_info["path"].lower()
+                for category, patterns in matchable:
+                    if any(pattern in path for pattern in patterns):
+                        structure["categories"].setdefault(category, []).append(file_info)
         
         return structure
     
@@ -231,6 +294,7 @@ Consider:
             "failed": [],
             "skipped": []
         }
+        created_dirs = set()
         
         for move in plan.moves:
             src = move["source"]
@@ -246,10 +310,13 @@ Consider:
                 
                 if not dry_run:
                     # Create destination directory if it doesn't exist
-                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    parent = os.path.dirname(dst)
+                    if parent and parent not in created_dirs:
+                        os.makedirs(parent, exist_ok=True)
+                        created_dirs.add(parent)
                     
                     # Move the file/directory
-                    shutil.move(src, dst)
+                    self._move(src, dst)
                     
                     results["success"].append({
                         "source": src,
@@ -269,4 +336,19 @@ Consider:
                     "error": str(e)
                 })
         
-        return results 
\ No newline at end of file
+        return results 
+    
+    def _move(self, src: str, dst: str):
+        """Move src to dst with a plain rename when possible."""
+        # shutil.move moves into an existing directory, which rename would not
+        if os.path.isdir(dst):
+            shutil.move(src, dst)
+            return
+        try:
+            # replace, unlike rename on Windows, overwrites an existing file as shutil.move does
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Different filesystems need a copy and delete
+            shutil.move(src, dst)
@@ -1,4 +1,6 @@
+import threading
 import time
+from collections import OrderedDict
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import logging
@@ -8,24 +10,77 @@ from typing import Callable, Optional
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds a path must stay quiet before its callback fires
+DEBOUNCE_DELAY = 0.2
+# Seconds between scans of the pending paths
+DEBOUNCE_POLL = 0.1
+
 class FileChangeHandler(FileSystemEventHandler):
+    """Forward file events to a callback, coalescing bursts on the same path.
+
+    Editors often emit several events for one save; the callback runs once
+    per path after DEBOUNCE_DELAY seconds without further events.
+    """
+    
     def __init__(self, callback: Callable[[str], None]):
         self.callback = callback
+        # path -> time of its latest event, oldest first
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._drain, name="file-change-debounce", daemon=True)
+        self._worker.start()
         
     def on_modified(self, event):
         if not event.is_directory:
             logger.info(f"File modified: {event.src_path}")
-            self.callback(event.src_path)
+            self._queue_event(event.src_path)
             
     def on_created(self, event):
         if not event.is_directory:
             logger.info(f"File created: {event.src_path}")
-            self.callback(event.src_path)
+            self._queue_event(event.src_path)
             
     def on_deleted(self, event):
         if not event.is_directory:
             logger.info(f"File deleted: {event.src_path}")
-            self.callback(event.src_path)
+            self._queue_event(event.src_path)
+            
+    def stop(self):
+        """Stop the debounce thread and deliver any events still pending."""
+        self._stopped.set()
+        self._worker.join()
+        with self._lock:
+            paths = list(self._pending)
+            self._pending.clear()
+        for path in paths:
+            self._notify(path)
+            
+    def _queue_event(self, path: str):
+        with self._lock:
+            # Re-inserting keeps the dict ordered by latest event time
+            self._pending.pop(path, None)
+            self._pending[path] = time.monotonic()
+            
+    def _drain(self):
+        while not self._stopped.wait(DEBOUNCE_POLL):
+            cutoff = time.monotonic() - DEBOUNCE_DELAY
+            ready = []
+            with self._lock:
+                while self._pending:
+                    path, last_event = next(iter(self._pending.items()))
+                    if last_event > cutoff:
+                        break
+                    del self._pending[path]
+                    ready.append(path)
+            for path in ready:
+                self._notify(path)
+                
+    def _notify(self, path: str):
+        try:
+            self.callback(path)
+        except Exception as e:
+            logger.error(f"Error handling change to {path}: {str(e)}")
 
 class FileWatcher:
     def __init__(self, watch_path: str, callback: Callable[[str], None]):
@@ -48,6 +103,7 @@ class FileWatcher:
         try:
             self.observer.stop()
             self.observer.join()
+            self.handler.stop()
             logger.info("Stopped file watcher")
         except Exception as e:
             logger.error(f"Error stopping file watcher: {str(e)}")
@@ -1,16 +1,27 @@
 import cProfile
 import pstats
-import io
 import time
 import psutil
 import os
+import functools
+import types
+from operator import itemgetter
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import line_profiler
 import memory_profiler
 import tracemalloc
 
-@dataclass
+# Only consider functions taking more than this many seconds
+HOT_SPOT_THRESHOLD = 0.1
+
+@functools.lru_cache(maxsize=64)
+def _compile_file(file_path: str, mtime_ns: int, size: int) -> types.CodeType:
+    """Compile a Python file; the stat fields make edits miss the cache."""
+    with open(file_path, 'rb') as f:
+        return compile(f.read(), file_path, 'exec')
+
+@dataclass(slots=True)
 class PerformanceMetrics:
     execution_time: float
     memory_usage: float
@@ -23,37 +34,32 @@ class PerformanceProfiler:
     """Analyzes code performance and provides optimization suggestions."""
     
     def __init__(self):
-        self.profiler = cProfile.Profile()
         self.line_profiler = line_profiler.LineProfiler()
-        tracemalloc.start()
+        self._proc = psutil.Process()
     
     def profile_function(self, func, *args, **kwargs) -> PerformanceMetrics:
         """Profile a single function's performance."""
-        # CPU Profiling
-        self.profiler.enable()
+        # CPU and line profiling share a single run so func's side effects happen once
+        self.line_profiler.add_function(func)
+        was_tracing = self._start_memory_trace()
+        # A fresh profiler per call keeps stats from accumulating across runs
+        profiler = cProfile.Profile()
+        profiler.enable()
+        self.line_profiler.enable()
         start_time = time.time()
-        start_memory = psutil.Process().memory_info().rss
-        
-        result = func(*args, **kwargs)
+        start_memory = self._proc.memory_info().rss
         
-        end_time = time.time()
-        end_memory = psutil.Process().memory_info().rss
-        self.profiler.disable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            end_time = time.time()
+            end_memory = self._proc.memory_info().rss
+            self.line_profiler.disable()
+            profiler.disable()
+            memory_stats = self._stop_memory_trace(was_tracing)
         
         # Get profiling stats
-        s = io.StringIO()
-        ps = pstats.Stats(self.profiler, stream=s).sort_stats('cumulative')
-        ps.print_stats()
-        
-        # Line profiling
-        self.line_profiler.add_function(func)
-        self.line_profiler.enable()
-        func(*args, **kwargs)
-        self.line_profiler.disable()
-        
-        # Memory profiling
-        memory_stats = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+        ps = pstats.Stats(profiler)
         
         # Analyze hot spots
         hot_spots = self._analyze_hot_spots(ps)
@@ -73,29 +79,28 @@ class PerformanceProfiler:
     def profile_file(self, file_path: str) -> Dict[str, Any]:
         """Profile an entire Python file."""
         try:
-            with open(file_path, 'r') as f:
-                code = f.read()
+            # Compile before profiling starts so parse time is not measured
+            stat = os.stat(file_path)
+            code = _compile_file(file_path, stat.st_mtime_ns, stat.st_size)
             
             # Create a temporary module to run the code
             namespace = {}
-            self.profiler.enable()
+            was_tracing = self._start_memory_trace()
+            profiler = cProfile.Profile()
+            profiler.enable()
             start_time = time.time()
-            start_memory = psutil.Process().memory_info().rss
-            
-            exec(code, namespace)
+            start_memory = self._proc.memory_info().rss
             
-            end_time = time.time()
-            end_memory = psutil.Process().memory_info().rss
-            self.profiler.disable()
+            try:
+                exec(code, namespace)
+            finally:
+                end_time = time.time()
+                end_memory = self._proc.memory_info().rss
+                profiler.disable()
+                memory_stats = self._stop_memory_trace(was_tracing)
             
             # Get profiling stats
-            s = io.StringIO()
-            ps = pstats.Stats(self.profiler, stream=s).sort_stats('cumulative')
-            ps.print_stats()
-            
-            # Memory profiling
-            memory_stats = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
+            ps = pstats.Stats(profiler)
             
             return {
                 "execution_time": end_time - start_time,
@@ -109,18 +114,40 @@ class PerformanceProfiler:
         except Exception as e:
             return {"error": str(e)}
     
+    def _start_memory_trace(self) -> bool:
+        """Start tracing allocations for one measured run; return whether tracing was already on."""
+        if tracemalloc.is_tracing():
+            # Leave the caller's tracing running, just measure the peak afresh
+            tracemalloc.reset_peak()
+            return True
+        tracemalloc.start()
+        return False
+    
+    def _stop_memory_trace(self, was_tracing: bool) -> tuple:
+        """Return (current, peak) traced memory and stop tracing unless it was already on."""
+        memory_stats = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        return memory_stats
+    
     def _analyze_hot_spots(self, stats: pstats.Stats) -> List[Dict[str, Any]]:
         """Analyze code hot spots from profiling data."""
-        hot_spots = []
-        for func, (cc, nc, tt, ct, callers) in stats.stats.items():
-            if ct > 0.1:  # Only consider functions taking more than 0.1 seconds
-                hot_spots.append({
-                    "function": f"{func[0]}:{func[1]}:{func[2]}",
-                    "total_time": ct,
-                    "calls": nc,
-                    "time_per_call": ct / nc if nc > 0 else 0
-                })
-        return sorted(hot_spots, key=lambda x: x["total_time"], reverse=True)
+        # Filter and rank the raw tuples; only the survivors become dicts
+        rows = [
+            (ct, nc, func)
+            for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+            if ct > HOT_SPOT_THRESHOLD
+        ]
+        rows.sort(key=itemgetter(0), reverse=True)
+        return [
+            {
+                "function": f"{func[0]}:{func[1]}:{func[2]}",
+                "total_time": ct,
+                "calls": nc,
+                "time_per_call": ct / nc if nc > 0 else 0
+            }
+            for ct, nc, func in rows
+        ]
     
     def _check_memory_leaks(self, start_memory: int, end_memory: int, 
                            memory_stats: tuple) -> List[Dict[str, Any]]:
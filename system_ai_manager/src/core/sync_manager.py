@@ -1,21 +1,98 @@
 from dataclasses import dataclass
-from typing import Dict, List, Any, Optional
+from typing import BinaryIO, Callable, Dict, Iterator, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import json
+import fnmatch
+import functools
+import re
 import hashlib
+import mmap
 import shutil
 from pathlib import Path
 from datetime import datetime
 import logging
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
+import collections
+import contextlib
 import threading
 import time
 import queue
 import watchdog.observers
 import watchdog.events
+from watchdog.observers.polling import PollingObserver
+
+# Bytes read per call when hashing
+HASH_CHUNK_SIZE = 1 << 20
+# Files at least this large are hashed on several threads
+HASH_THREADED_MIN_SIZE = 16 << 20
+# Files at least this large are hashed through a memory map instead of reads
+HASH_MMAP_MIN_SIZE = 100 << 20
+
+try:
+    import blake3
+    
+    def _new_file_hasher(size: int):
+        if size >= HASH_THREADED_MIN_SIZE:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO)
+        return blake3.blake3()
+except ImportError:
+    blake3 = None
+    
+    def _new_file_hasher(size: int):
+        return hashlib.sha256()
+
+# Encrypted files start with this magic, then a per-file salt and the chunk size
+ENCRYPTION_MAGIC = b"SMAE\x01"
+ENCRYPTION_SALT_SIZE = 16
+# Plaintext bytes sealed per AES-GCM chunk; each adds a 16-byte tag
+ENCRYPTION_CHUNK_SIZE = 64 << 10
+_GCM_TAG_SIZE = 16
+
+# Seconds between directory scans when the platform has no native file events
+SYNC_POLL_INTERVAL = 60
+
+# Seconds of file events gathered into one sync task
+SYNC_EVENT_WINDOW = 0.25
+
+@functools.lru_cache(maxsize=4096)
+def _derive_file_key(master_key: bytes, salt: bytes) -> bytes:
+    """Derive a file's AES-256 key; the same salt always gives the same key."""
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=b"sync-manager file key")
+    return hkdf.derive(master_key)
+
+def _chunk_nonce_and_aad(header: bytes, index: int, last: bool):
+    """Nonce and associated data binding a chunk to its file, position and finality."""
+    return index.to_bytes(12, "big"), header + index.to_bytes(8, "big") + (b"\x01" if last else b"\x00")
+
+@functools.lru_cache(maxsize=16)
+def _compile_exclude_patterns(patterns: Tuple[str, ...]) -> Tuple[Optional["re.Pattern[str]"], Tuple[str, ...]]:
+    """Split exclude globs into one regex over file names and the globs spanning directories."""
+    name_globs = [os.path.normcase(p) for p in patterns if "/" not in p and os.sep not in p]
+    path_globs = tuple(p for p in patterns if "/" in p or os.sep in p)
+    name_re = re.compile("|".join(map(fnmatch.translate, name_globs))) if name_globs else None
+    return name_re, path_globs
+
+@contextlib.contextmanager
+def _atomic_write(dest_path: str) -> Iterator[BinaryIO]:
+    """Write to a temporary file that replaces dest_path only once fully on disk."""
+    # The .tmp suffix also keeps the watcher's exclude patterns off it
+    tmp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
 
 @dataclass
 class SyncConfig:
@@ -42,9 +119,16 @@ class SyncManager:
             exclude_patterns=["*.tmp", "*.log", "*.cache"]
         )
         self.fernet = None
+        self._master_key = None
         self.sync_queue = queue.Queue()
         self.sync_thread = None
         self.observer = None
+        self.event_handler = None
+        self._pool = None
+        # Backup directories, oldest first
+        self._backup_dirs: "collections.deque[str]" = collections.deque()
+        # path -> ((st_mtime_ns, st_size), hash) of its last hashed version
+        self._hash_cache: Dict[str, tuple] = {}
         self.initialize()
         
     def initialize(self):
@@ -53,6 +137,18 @@ class SyncManager:
         os.makedirs(self.config.sync_dir, exist_ok=True)
         os.makedirs(self.config.backup_dir, exist_ok=True)
         
+        # List existing backups once; later ones are tracked as they are made
+        with os.scandir(self.config.backup_dir) as entries:
+            self._backup_dirs = collections.deque(sorted(
+                entry.path for entry in entries if entry.is_dir()
+            ))
+        
+        # Hashing, encryption and copying release the GIL, so files go to a thread pool
+        self._pool = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 2),
+            thread_name_prefix="sync-file"
+        )
+        
         # Initialize encryption if enabled
         if self.config.encryption_enabled:
             self._initialize_encryption()
@@ -76,10 +172,13 @@ class SyncManager:
                 
             # Create Fernet instance
             self.fernet = Fernet(key)
+            # Files are encrypted with keys derived from the raw Fernet key
+            self._master_key = base64.urlsafe_b64decode(key)
             
         except Exception as e:
             logging.error(f"Failed to initialize encryption: {e}")
             self.fernet = None
+            self._master_key = None
             
     def _start_sync_thread(self):
         """Start background sync thread."""
@@ -92,47 +191,76 @@ class SyncManager:
     def _sync_worker(self):
         """Background sync worker."""
         while True:
+            # Block until work arrives, then take everything already queued
+            tasks = [self.sync_queue.get()]
+            while True:
+                try:
+                    tasks.append(self.sync_queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
             try:
-                # Get sync task from queue
-                task = self.sync_queue.get()
-                
-                # Process sync task
-                if task["type"] == "sync":
-                    self._process_sync(task["paths"])
-                elif task["type"] == "backup":
-                    self._process_backup(task["paths"])
+                # Bursts of sync tasks collapse into one pass over the distinct paths
+                sync_paths = {}
+                for task in tasks:
+                    if task is not None and task["type"] == "sync":
+                        sync_paths.update(dict.fromkeys(task["paths"]))
+                if sync_paths:
+                    self._process_sync(list(sync_paths))
                     
-                # Mark task as done
-                self.sync_queue.task_done()
-                
+                for task in tasks:
+                    if task is not None and task["type"] == "backup":
+                        self._process_backup(task["paths"])
+                        
             except Exception as e:
                 logging.error(f"Sync worker error: {e}")
                 
-            # Sleep for sync interval
-            time.sleep(self.config.sync_interval)
+            finally:
+                # Mark tasks as done
+                for _ in tasks:
+                    self.sync_queue.task_done()
+                    
+            # stop() queues None to end the worker
+            if None in tasks:
+                return
             
     def _start_file_watcher(self):
         """Start file system watcher."""
         try:
-            # Create observer
-            self.observer = watchdog.observers.Observer()
-            
             # Create event handler
-            handler = SyncEventHandler(self)
-            
-            # Schedule watching
-            self.observer.schedule(
-                handler,
-                self.config.sync_dir,
-                recursive=True
-            )
-            
-            # Start observer
-            self.observer.start()
+            self.event_handler = SyncEventHandler(self)
             
+            try:
+                self.observer = self._start_observer(watchdog.observers.Observer)
+            except OSError as e:
+                if watchdog.observers.Observer is PollingObserver:
+                    raise
+                # e.g. the inotify watch limit is reached; polling still works
+                logging.warning(f"Native file watching unavailable ({e}), falling back to polling")
+                self.observer = self._start_observer(PollingObserver)
+                
         except Exception as e:
             logging.error(f"Failed to start file watcher: {e}")
             
+    def _start_observer(self, observer_class) -> "watchdog.observers.api.BaseObserver":
+        """Create, schedule and start an observer of the sync directory."""
+        # Native observers wait on the OS; only polling needs a slower interval
+        if observer_class is PollingObserver:
+            observer = PollingObserver(timeout=SYNC_POLL_INTERVAL)
+        else:
+            observer = observer_class()
+            
+        # Schedule watching
+        observer.schedule(
+            self.event_handler,
+            self.config.sync_dir,
+            recursive=True
+        )
+        
+        # Start observer
+        observer.start()
+        return observer
+        
     def sync_files(self, paths: List[str]) -> Dict[str, Any]:
         """Sync files between locations."""
         try:
@@ -156,20 +284,8 @@ class SyncManager:
     def _process_sync(self, paths: List[str]):
         """Process sync task."""
         try:
-            for path in paths:
-                # Check if path exists
-                if not os.path.exists(path):
-                    continue
-                    
-                # Get file info
-                file_info = self._get_file_info(path)
-                
-                # Check if file should be synced
-                if not self._should_sync_file(path):
-                    continue
-                    
-                # Sync file
-                self._sync_file(path, file_info)
+            # Sync files that should be synced
+            self._run_parallel(self._sync_path, [path for path in paths if self._should_sync_file(path)])
                 
             # Notify if enabled
             if self.config.notify_on_sync:
@@ -178,6 +294,23 @@ class SyncManager:
         except Exception as e:
             logging.error(f"Sync process error: {e}")
             
+    def _sync_path(self, path: str):
+        """Sync a file if it still exists."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        self._sync_file(path, stat)
+        
+    def _run_parallel(self, func: Callable[..., None], paths: List[str], *args):
+        """Call func(path, *args) for every path on the file pool and wait for all of them."""
+        futures = [self._pool.submit(func, path, *args) for path in paths]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"File task error: {e}")
+                
     def _get_file_info(self, path: str) -> Dict[str, Any]:
         """Get file information."""
         stat = os.stat(path)
@@ -185,37 +318,66 @@ class SyncManager:
             "path": path,
             "size": stat.st_size,
             "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "hash": self._calculate_file_hash(path)
+            "hash": self._get_file_hash(path, stat)
         }
         
+    def _get_file_hash(self, path: str, stat: os.stat_result) -> str:
+        """Get a file's hash, reusing the last one while its size and mtime are unchanged."""
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hash_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = self._calculate_file_hash(path)
+        self._hash_cache[path] = (key, digest)
+        return digest
+        
     def _calculate_file_hash(self, path: str) -> str:
         """Calculate file hash."""
-        hasher = hashlib.sha256()
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hasher.update(chunk)
+        with open(path, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if blake3 is None and hasattr(hashlib, "file_digest"):
+                # Python 3.11+ reads and hashes in C without a per-chunk Python loop
+                return hashlib.file_digest(f, "sha256").hexdigest()
+                
+            size = os.fstat(f.fileno()).st_size
+            hasher = _new_file_hasher(size)
+            if size >= HASH_MMAP_MIN_SIZE:
+                # One update over the mapping skips the per-read copies
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    hasher.update(mm)
+            else:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
         return hasher.hexdigest()
         
     def _should_sync_file(self, path: str) -> bool:
         """Check if file should be synced."""
         # Check exclude patterns
-        for pattern in self.config.exclude_patterns:
+        name_re, path_globs = _compile_exclude_patterns(tuple(self.config.exclude_patterns or ()))
+        if name_re is not None and name_re.match(os.path.normcase(os.path.basename(path))):
+            return False
+        for pattern in path_globs:
             if Path(path).match(pattern):
                 return False
                 
         return True
         
-    def _sync_file(self, path: str, file_info: Dict[str, Any]):
+    def _sync_file(self, path: str, stat: os.stat_result):
         """Sync single file."""
         try:
             # Get sync destination
             dest_path = self._get_sync_destination(path)
             
             # Check if file needs syncing
-            if os.path.exists(dest_path):
-                dest_info = self._get_file_info(dest_path)
-                if dest_info["hash"] == file_info["hash"]:
-                    return
+            try:
+                dest_stat = os.stat(dest_path)
+            except FileNotFoundError:
+                dest_stat = None
+            if dest_stat is not None and self._is_up_to_date(path, stat, dest_path, dest_stat):
+                return
                     
             # Create destination directory
             os.makedirs(os.path.dirname(dest_path), exist_ok=True)
@@ -229,6 +391,16 @@ class SyncManager:
         except Exception as e:
             logging.error(f"File sync error: {e}")
             
+    def _is_up_to_date(self, path: str, stat: os.stat_result,
+                       dest_path: str, dest_stat: os.stat_result) -> bool:
+        """Compare a file with its copy, hashing only when the stat data cannot decide."""
+        if stat.st_size != dest_stat.st_size:
+            return False
+        # copy2 carries the mtime over, so an untouched copy matches exactly
+        if stat.st_mtime_ns == dest_stat.st_mtime_ns:
+            return True
+        return self._get_file_hash(path, stat) == self._get_file_hash(dest_path, dest_stat)
+        
     def _get_sync_destination(self, path: str) -> str:
         """Get sync destination path."""
         # Convert to relative path
@@ -237,20 +409,32 @@ class SyncManager:
         # Create destination path
         return os.path.join(self.config.sync_dir, rel_path)
         
+    def _file_cipher(self, salt: bytes) -> AESGCM:
+        """Get the AES-256-GCM cipher for a file from its salt."""
+        return AESGCM(_derive_file_key(self._master_key, salt))
+        
     def _encrypt_and_copy(self, src_path: str, dest_path: str):
         """Encrypt and copy file."""
         try:
-            # Read source file
-            with open(src_path, "rb") as f:
-                data = f.read()
-                
-            # Encrypt data
-            encrypted_data = self.fernet.encrypt(data)
-            
-            # Write encrypted data
-            with open(dest_path, "wb") as f:
-                f.write(encrypted_data)
-                
+            salt = os.urandom(ENCRYPTION_SALT_SIZE)
+            header = ENCRYPTION_MAGIC + salt + ENCRYPTION_CHUNK_SIZE.to_bytes(4, "big")
+            cipher = self._file_cipher(salt)
+            
+            # Encrypt chunk by chunk so memory use does not grow with the file
+            with open(src_path, "rb") as src, _atomic_write(dest_path) as dest:
+                dest.write(header)
+                chunk = src.read(ENCRYPTION_CHUNK_SIZE)
+                index = 0
+                while True:
+                    next_chunk = src.read(ENCRYPTION_CHUNK_SIZE)
+                    last = not next_chunk
+                    nonce, aad = _chunk_nonce_and_aad(header, index, last)
+                    dest.write(cipher.encrypt(nonce, chunk, aad))
+                    if last:
+                        break
+                    chunk = next_chunk
+                    index += 1
+                    
         except Exception as e:
             logging.error(f"Encryption error: {e}")
             
@@ -281,11 +465,13 @@ class SyncManager:
             backup_time = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_dir = os.path.join(self.config.backup_dir, backup_time)
             os.makedirs(backup_dir, exist_ok=True)
+            # Backups started within the same second share a directory
+            if not self._backup_dirs or self._backup_dirs[-1] != backup_dir:
+                self._backup_dirs.append(backup_dir)
             
             # Backup files
-            for path in paths:
-                if os.path.exists(path):
-                    self._backup_file(path, backup_dir)
+            created_dirs = set()
+            self._run_parallel(self._backup_file, [path for path in paths if os.path.exists(path)], backup_dir, created_dirs)
                     
             # Cleanup old backups
             self._cleanup_old_backups()
@@ -297,7 +483,7 @@ class SyncManager:
         except Exception as e:
             logging.error(f"Backup process error: {e}")
             
-    def _backup_file(self, path: str, backup_dir: str):
+    def _backup_file(self, path: str, backup_dir: str, created_dirs: Optional[set] = None):
         """Backup single file."""
         try:
             # Get relative path
@@ -306,8 +492,12 @@ class SyncManager:
             # Create destination path
             dest_path = os.path.join(backup_dir, rel_path)
             
-            # Create destination directory
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            # Create destination directory, once per directory within a backup
+            parent = os.path.dirname(dest_path)
+            if created_dirs is None or parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                if created_dirs is not None:
+                    created_dirs.add(parent)
             
             # Copy file
             if self.config.encryption_enabled and self.fernet:
@@ -321,17 +511,10 @@ class SyncManager:
     def _cleanup_old_backups(self):
         """Cleanup old backups."""
         try:
-            # Get backup directories
-            backup_dirs = sorted([
-                os.path.join(self.config.backup_dir, d)
-                for d in os.listdir(self.config.backup_dir)
-                if os.path.isdir(os.path.join(self.config.backup_dir, d))
-            ])
-            
             # Remove old backups
-            while len(backup_dirs) > self.config.max_backups:
-                old_dir = backup_dirs.pop(0)
-                shutil.rmtree(old_dir)
+            while len(self._backup_dirs) > self.config.max_backups:
+                old_dir = self._backup_dirs.popleft()
+                shutil.rmtree(old_dir, ignore_errors=True)
                 
         except Exception as e:
             logging.error(f"Backup cleanup error: {e}")
@@ -384,17 +567,36 @@ class SyncManager:
     def _decrypt_and_copy(self, src_path: str, dest_path: str):
         """Decrypt and copy file."""
         try:
-            # Read encrypted file
-            with open(src_path, "rb") as f:
-                encrypted_data = f.read()
-                
-            # Decrypt data
-            decrypted_data = self.fernet.decrypt(encrypted_data)
-            
-            # Write decrypted data
-            with open(dest_path, "wb") as f:
-                f.write(decrypted_data)
+            with open(src_path, "rb") as src:
+                magic = src.read(len(ENCRYPTION_MAGIC))
+                if magic != ENCRYPTION_MAGIC:
+                    # Written before chunked encryption, as a single Fernet token
+                    src.seek(0)
+                    decrypted_data = self.fernet.decrypt(src.read())
+                    with _atomic_write(dest_path) as dest:
+                        dest.write(decrypted_data)
+                    return
+                    
+                salt = src.read(ENCRYPTION_SALT_SIZE)
+                chunk_size_bytes = src.read(4)
+                header = magic + salt + chunk_size_bytes
+                record_size = int.from_bytes(chunk_size_bytes, "big") + _GCM_TAG_SIZE
+                cipher = self._file_cipher(salt)
                 
+                # The last-chunk flag in the AAD makes truncated files fail to decrypt
+                with _atomic_write(dest_path) as dest:
+                    record = src.read(record_size)
+                    index = 0
+                    while True:
+                        next_record = src.read(record_size)
+                        last = not next_record
+                        nonce, aad = _chunk_nonce_and_aad(header, index, last)
+                        dest.write(cipher.decrypt(nonce, record, aad))
+                        if last:
+                            break
+                        record = next_record
+                        index += 1
+                        
         except Exception as e:
             logging.error(f"Decryption error: {e}")
             
@@ -416,27 +618,44 @@ class SyncManager:
                 self.observer.stop()
                 self.observer.join()
                 
+            # Queue events still waiting in the handler
+            if self.event_handler:
+                self.event_handler.flush()
+                
             # Stop sync thread
             if self.sync_thread:
                 self.sync_queue.put(None)
                 self.sync_thread.join()
                 
+            # Stop file pool
+            if self._pool:
+                self._pool.shutdown()
+                
         except Exception as e:
             logging.error(f"Stop error: {e}")
 
 class SyncEventHandler(watchdog.events.FileSystemEventHandler):
-    """File system event handler for sync."""
+    """File system event handler for sync.
+
+    Events arriving within SYNC_EVENT_WINDOW seconds of the first one are
+    queued as a single sync task, so an editor saving a file several times
+    does not flood the sync queue.
+    """
     
     def __init__(self, sync_manager):
         self.sync_manager = sync_manager
+        # Insertion-ordered set of paths awaiting sync
+        self._pending: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
         
     def on_created(self, event):
         if not event.is_directory:
-            self.sync_manager.sync_files([event.src_path])
+            self._queue_path(event.src_path)
             
     def on_modified(self, event):
         if not event.is_directory:
-            self.sync_manager.sync_files([event.src_path])
+            self._queue_path(event.src_path)
             
     def on_deleted(self, event):
         if not event.is_directory:
@@ -446,4 +665,24 @@ class SyncEventHandler(watchdog.events.FileSystemEventHandler):
     def on_moved(self, event):
         if not event.is_directory:
             # Handle file move
-            pass 
\ No newline at end of file
+            pass
+            
+    def flush(self):
+        """Queue a sync task for all pending paths."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            paths = list(self._pending)
+            self._pending.clear()
+        if paths:
+            self.sync_manager.sync_files(paths)
+            
+    def _queue_path(self, path: str):
+        with self._lock:
+            self._pending[path] = None
+            # The first event of a window arms the timer; later ones ride along
+            if self._timer is None:
+                self._timer = threading.Timer(SYNC_EVENT_WINDOW, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
\ No newline at end of file
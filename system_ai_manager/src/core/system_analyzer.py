@@ -2,7 +2,10 @@ import os
 import platform
 import psutil
 import subprocess
-from typing import Dict, List, Optional, Any
+import csv
+import io
+import time
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 import logging
 from pathlib import Path
 import winreg
@@ -11,13 +14,31 @@ import json
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds an installed-software listing is reused
+SOFTWARE_CACHE_TTL = 60
+
+# Per-process fields reported by _get_running_processes
+PROCESS_ATTRS = ['pid', 'name', 'username', 'memory_percent', 'cpu_percent']
+# Seconds between the priming CPU sample and the first real one
+CPU_SAMPLE_INTERVAL = 0.1
+
+# File name endings flagged by find_potentially_harmful_files
+SUSPICIOUS_EXTENSIONS = ('.exe', '.bat', '.cmd', '.vbs', '.js', '.ps1')
+
 class SystemAnalyzer:
     def __init__(self):
         self.system_info = {}
+        # (time.monotonic() when listed, installed software)
+        self._software_cache: Optional[Tuple[float, List[Dict[str, str]]]] = None
+        self._cpu_sampled = False
+        # Start the system-wide CPU sample that get_system_info reads
+        psutil.cpu_percent(interval=None)
         
     def get_system_info(self) -> Dict[str, Any]:
         """Get comprehensive system information."""
         try:
+            vm = psutil.virtual_memory()
+            freq = psutil.cpu_freq()
             self.system_info = {
                 "platform": {
                     "system": platform.system(),
@@ -30,13 +51,14 @@ class SystemAnalyzer:
                     "cpu": {
                         "physical_cores": psutil.cpu_count(logical=False),
                         "total_cores": psutil.cpu_count(logical=True),
-                        "cpu_freq": psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None,
-                        "cpu_percent": psutil.cpu_percent(interval=1)
+                        "cpu_freq": freq._asdict() if freq else None,
+                        # Usage since the previous call (or since __init__) without blocking
+                        "cpu_percent": psutil.cpu_percent(interval=None)
                     },
                     "memory": {
-                        "total": psutil.virtual_memory().total,
-                        "available": psutil.virtual_memory().available,
-                        "percent": psutil.virtual_memory().percent
+                        "total": vm.total,
+                        "available": vm.available,
+                        "percent": vm.percent
                     },
                     "disk": {
                         "partitions": [partition._asdict() for partition in psutil.disk_partitions()],
@@ -55,6 +77,12 @@ class SystemAnalyzer:
             
     def _get_installed_software(self) -> List[Dict[str, str]]:
         """Get list of installed software."""
+        # Walking the uninstall keys opens every subkey, so reuse a recent result
+        now = time.monotonic()
+        if self._software_cache is not None and now - self._software_cache[0] < SOFTWARE_CACHE_TTL:
+            # Callers get their own records, so editing them leaves the cache intact
+            return [dict(software) for software in self._software_cache[1]]
+            
         software_list = []
         try:
             if platform.system() == "Windows":
@@ -78,13 +106,18 @@ class SystemAnalyzer:
                                                 "name": name,
                                                 "version": version
                                             })
-                                        except:
+                                        except FileNotFoundError:
+                                            # Entries without a name or version are not listed
                                             continue
-                                except:
+                                except OSError:
+                                    # Subkey removed or not readable
                                     continue
-                    except:
+                    except OSError:
+                        # e.g. no WOW6432Node on 32-bit Windows
                         continue
                         
+            self._software_cache = (now, [dict(software) for software in software_list])
+            
         except Exception as e:
             logger.error(f"Error getting installed software: {str(e)}")
             
@@ -97,36 +130,79 @@ class SystemAnalyzer:
             if platform.system() == "Windows":
                 # Windows driver information
                 try:
-                    output = subprocess.check_output(
-                        "driverquery /v /fo csv",
-                        shell=True,
-                        stderr=subprocess.STDOUT
-                    ).decode('utf-8')
-                    
-                    for line in output.split('\n')[1:]:  # Skip header
-                        if line.strip():
-                            parts = line.strip('"').split('","')
-                            if len(parts) >= 4:
-                                drivers.append({
-                                    "name": parts[0],
-                                    "display_name": parts[1],
-                                    "type": parts[2],
-                                    "state": parts[3]
-                                })
-                except:
-                    pass
+                    drivers = self._query_drivers_wmi()
+                except Exception as e:
+                    # COM/WMI unavailable; ask driverquery instead
+                    logger.debug(f"WMI driver query failed: {str(e)}")
+                    drivers = self._query_drivers_driverquery()
                     
         except Exception as e:
             logger.error(f"Error getting driver info: {str(e)}")
             
         return drivers
         
+    def _query_drivers_wmi(self) -> List[Dict[str, str]]:
+        """List drivers with one in-process WMI query instead of spawning driverquery."""
+        import pythoncom
+        import win32com.client
+        
+        # COM must be initialized on whichever thread asks
+        pythoncom.CoInitialize()
+        try:
+            locator = win32com.client.Dispatch("WbemScripting.SWbemLocator")
+            service = locator.ConnectServer(".", "root\\cimv2")
+            rows = service.ExecQuery("SELECT Name, DisplayName, ServiceType, State FROM Win32_SystemDriver")
+            return [
+                {
+                    "name": row.Name,
+                    "display_name": row.DisplayName,
+                    "type": row.ServiceType,
+                    "state": row.State
+                }
+                for row in rows
+            ]
+        finally:
+            pythoncom.CoUninitialize()
+            
+    def _query_drivers_driverquery(self) -> List[Dict[str, str]]:
+        """List drivers by parsing driverquery's CSV output."""
+        drivers = []
+        try:
+            # Run driverquery directly rather than through cmd.exe
+            output = subprocess.run(
+                ['driverquery', '/v', '/fo', 'csv'],
+                capture_output=True,
+                encoding='utf-8',
+                errors='replace',
+                timeout=10,
+                check=True
+            ).stdout
+            
+            # Verbose columns: Module Name, Display Name, Description, Driver Type, Start Mode, State, ...
+            rows = csv.reader(io.StringIO(output))
+            next(rows, None)  # Skip header
+            for parts in rows:
+                if len(parts) >= 6:
+                    drivers.append({
+                        "name": parts[0],
+                        "display_name": parts[1],
+                        "type": parts[3],
+                        "state": parts[5]
+                    })
+        except (OSError, subprocess.SubprocessError):
+            pass
+            
+        return drivers
+        
     def _get_network_info(self) -> Dict[str, Any]:
         """Get network interface information."""
         try:
             return {
-                "interfaces": [interface._asdict() for interface in psutil.net_if_addrs().items()],
-                "connections": [conn._asdict() for conn in psutil.net_connections()],
+                "interfaces": {
+                    name: [addr._asdict() for addr in addrs]
+                    for name, addrs in psutil.net_if_addrs().items()
+                },
+                "connections": [conn._asdict() for conn in psutil.net_connections(kind='inet')],
                 "io_counters": psutil.net_io_counters()._asdict()
             }
         except Exception as e:
@@ -137,11 +213,16 @@ class SystemAnalyzer:
         """Get information about running processes."""
         processes = []
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'username', 'memory_percent', 'cpu_percent']):
-                try:
-                    processes.append(proc.info)
-                except:
-                    continue
+            # cpu_percent is measured since the previous sample, which psutil keeps on
+            # the Process objects process_iter reuses; the very first pass only reads 0.0
+            if not self._cpu_sampled:
+                for _ in psutil.process_iter(['cpu_percent'], ad_value=None):
+                    pass
+                time.sleep(CPU_SAMPLE_INTERVAL)
+                self._cpu_sampled = True
+                
+            # ad_value fills in attributes that are denied instead of raising
+            processes = [proc.info for proc in psutil.process_iter(PROCESS_ATTRS, ad_value=None)]
         except Exception as e:
             logger.error(f"Error getting running processes: {str(e)}")
             
@@ -151,39 +232,85 @@ class SystemAnalyzer:
         """Check file permissions and security."""
         try:
             stat = os.stat(file_path)
-            return {
-                "path": file_path,
-                "permissions": {
-                    "mode": stat.st_mode,
-                    "uid": stat.st_uid,
-                    "gid": stat.st_gid,
-                    "size": stat.st_size,
-                    "atime": stat.st_atime,
-                    "mtime": stat.st_mtime,
-                    "ctime": stat.st_ctime
-                },
-                "is_readable": os.access(file_path, os.R_OK),
-                "is_writable": os.access(file_path, os.W_OK),
-                "is_executable": os.access(file_path, os.X_OK)
-            }
+            return self._permissions_record(
+                file_path,
+                stat,
+                os.access(file_path, os.R_OK),
+                os.access(file_path, os.W_OK),
+                os.access(file_path, os.X_OK)
+            )
         except Exception as e:
             logger.error(f"Error checking file permissions: {str(e)}")
             return {"error": str(e)}
             
+    def _permissions_record(self, file_path: str, stat: os.stat_result,
+                            is_readable: bool, is_writable: bool, is_executable: bool) -> Dict[str, Any]:
+        """Build the check_file_permissions result from stat data and access flags."""
+        return {
+            "path": file_path,
+            "permissions": {
+                "mode": stat.st_mode,
+                "uid": stat.st_uid,
+                "gid": stat.st_gid,
+                "size": stat.st_size,
+                "atime": stat.st_atime,
+                "mtime": stat.st_mtime,
+                "ctime": stat.st_ctime
+            },
+            "is_readable": is_readable,
+            "is_writable": is_writable,
+            "is_executable": is_executable
+        }
+        
+    def _entry_permissions(self, entry: os.DirEntry) -> Dict[str, Any]:
+        """check_file_permissions for a scanned entry, reusing the stat the scan may already hold."""
+        try:
+            stat = entry.stat()
+            # os.access also honours the real uid, ACLs and read-only or noexec mounts
+            return self._permissions_record(
+                entry.path,
+                stat,
+                os.access(entry.path, os.R_OK),
+                os.access(entry.path, os.W_OK),
+                os.access(entry.path, os.X_OK)
+            )
+        except Exception as e:
+            logger.error(f"Error checking file permissions: {str(e)}")
+            return {"error": str(e)}
+            
+    def _iter_files(self, directory: str) -> Iterator[os.DirEntry]:
+        """Yield non-directory entries below directory in os.walk order, skipping unreadable ones."""
+        stack = [directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    yield entry
+                elif not entry.is_symlink():
+                    subdirs.append(entry.path)
+            stack.extend(reversed(subdirs))
+            
     def find_potentially_harmful_files(self, directory: str) -> List[Dict[str, Any]]:
         """Find potentially harmful files in a directory."""
         harmful_files = []
         try:
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # Check for suspicious file extensions
-                    if file.lower().endswith(('.exe', '.bat', '.cmd', '.vbs', '.js', '.ps1')):
-                        harmful_files.append({
-                            "path": file_path,
-                            "type": "executable",
-                            "permissions": self.check_file_permissions(file_path)
-                        })
+            for entry in self._iter_files(directory):
+                # Check for suspicious file extensions
+                if entry.name.lower().endswith(SUSPICIOUS_EXTENSIONS):
+                    harmful_files.append({
+                        "path": entry.path,
+                        "type": "executable",
+                        "permissions": self._entry_permissions(entry)
+                    })
         except Exception as e:
             logger.error(f"Error finding harmful files: {str(e)}")
             
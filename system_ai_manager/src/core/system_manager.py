@@ -1,18 +1,156 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 import os
 import json
+import heapq
 import psutil
 import platform
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
 import time
-import queue
 import subprocess
+import sys
 import shutil
 from pathlib import Path
 
+# Seconds a system-wide psutil reading is reused by back-to-back callers
+METRIC_CACHE_TTL = 0.1
+# Stat files the Linux process scanner keeps open between scans
+PROC_STAT_MAX_FDS = 512
+# /proc/<pid>/stat is well under this size
+PROC_STAT_READ_SIZE = 4096
+# Splits of the fields after comm needed to reach rss (field 24, index 21)
+_STAT_SPLITS = 22
+# Seconds the first monitor tick waits so its CPU readings cover a real interval
+CPU_BASELINE_DELAY = 1.0
+# Seconds between the two process scans _optimize_cpu compares
+CPU_SAMPLE_WINDOW = 1.0
+# Upper bound on threads removing files during cleanup
+CLEANUP_MAX_WORKERS = 16
+# Fields of the namedtuple psutil.cpu_freq() returns
+_CPU_FREQ_FIELDS = ('current', 'min', 'max')
+
+@dataclass(slots=True)
+class ProcessSnapshot:
+    """Process table sampled once and shared by metrics and CPU optimization.
+
+    Columns are parallel lists; row i describes one process.
+    """
+    taken: float  # time.monotonic() when sampled
+    interval: float  # seconds the CPU figures cover; 0.0 for a first scan
+    pids: List[int]
+    names: List[Optional[str]]
+    cpu: List[float]
+    memory: List[float]
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """Rows as the dicts psutil's Process.info would give."""
+        return [
+            {"pid": pid, "name": name, "cpu_percent": cpu, "memory_percent": memory}
+            for pid, name, cpu, memory in zip(self.pids, self.names, self.cpu, self.memory)
+        ]
+
+class _ProcStatScanner:
+    """Build process snapshots on Linux straight from /proc/<pid>/stat.
+
+    Each stat file stays open between scans: procfs regenerates it on a read
+    from offset 0, so a repeat scan costs one pread per process instead of
+    open/read/close plus psutil's per-process objects.
+    """
+    
+    def __init__(self, max_open: int = PROC_STAT_MAX_FDS):
+        self.max_open = max_open
+        self._fds: Dict[int, int] = {}
+        # pid -> (start time, user + system ticks) at the previous scan
+        self._cpu_ticks: Dict[int, Tuple[int, int]] = {}
+        self._last_scan: Optional[float] = None
+        self._clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+        self._lock = threading.Lock()
+        
+    def scan(self, memory_total: int) -> ProcessSnapshot:
+        """Sample every process; CPU percentages cover the time since the previous scan."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_scan if self._last_scan is not None else 0.0
+            self._last_scan = now
+            
+            with os.scandir('/proc') as it:
+                pids = [int(entry.name) for entry in it if entry.name.isdigit()]
+            self._forget_exited(pids)
+            
+            pids_out, names, cpu, memory = [], [], [], []
+            cpu_ticks = {}
+            ticks_per_percent = self._clock_ticks * elapsed / 100
+            rss_to_percent = self._page_size * 100 / memory_total
+            for pid in pids:
+                data = self._read(pid)
+                if not data:
+                    continue
+                # comm may contain spaces and parentheses; the last ')' ends it.
+                # Only fields up to rss are needed, so the other ~30 stay unsplit
+                close = data.rindex(b')')
+                fields = data[close + 2:].split(b' ', _STAT_SPLITS)
+                ticks = int(fields[11]) + int(fields[12])  # utime + stime
+                start = int(fields[19])
+                previous = self._cpu_ticks.get(pid)
+                cpu_ticks[pid] = (start, ticks)
+                
+                pids_out.append(pid)
+                names.append(data[data.index(b'(') + 1:close].decode(errors='replace'))
+                if previous is not None and previous[0] == start and ticks_per_percent:
+                    cpu.append((ticks - previous[1]) / ticks_per_percent)
+                else:
+                    cpu.append(0.0)
+                memory.append(int(fields[21]) * rss_to_percent)
+                
+            self._cpu_ticks = cpu_ticks
+            return ProcessSnapshot(now, elapsed, pids_out, names, cpu, memory)
+            
+    def close(self):
+        """Close every stat file kept open."""
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+            
+    def _forget_exited(self, pids: List[int]):
+        live = set(pids)
+        for pid in [pid for pid in self._fds if pid not in live]:
+            os.close(self._fds.pop(pid))
+            
+    def _read(self, pid: int) -> Optional[bytes]:
+        fd = self._fds.get(pid)
+        if fd is not None:
+            try:
+                return os.pread(fd, PROC_STAT_READ_SIZE, 0)
+            except OSError:
+                # The process exited, possibly with its pid already reused
+                os.close(self._fds.pop(pid))
+        try:
+            fd = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            data = os.pread(fd, PROC_STAT_READ_SIZE, 0)
+        except OSError:
+            data = None
+        if data and len(self._fds) < self.max_open:
+            self._fds[pid] = fd
+        else:
+            os.close(fd)
+        return data
+
+def _iso(ts: float) -> str:
+    """Format a time.time() value the way datetime.isoformat() does."""
+    return datetime.fromtimestamp(ts).isoformat()
+
+def _root_disk_usage():
+    """Usage of the root filesystem."""
+    return psutil.disk_usage('/')
+
 @dataclass
 class SystemConfig:
     """Configuration for system management."""
@@ -38,13 +176,32 @@ class SystemManager:
                 "disk_percent": 80.0
             }
         )
-        self.monitor_queue = queue.Queue()
+        # Latest issue list for the optimizer; a newer one replaces any not yet handled
+        self._issue_slot: Optional[List[Dict[str, Any]]] = None
+        self._issue_event = threading.Event()
+        self._stop_event = threading.Event()
         self.monitor_thread = None
         self.optimization_thread = None
+        self._snapshot: Optional[ProcessSnapshot] = None
+        # key -> (time.monotonic() when sampled, value)
+        self._sysmetric_cache: Dict[str, Tuple[float, Any]] = {}
+        self._proc_scanner = _ProcStatScanner() if sys.platform.startswith('linux') else None
+        # time.monotonic() of the last psutil process scan, whose CPU figures start there
+        self._psutil_last_scan: Optional[float] = None
+        # Shared by cleanup passes; unlink and rmtree release the GIL, so removals overlap
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=min(CLEANUP_MAX_WORKERS, (os.cpu_count() or 1) * 2),
+            thread_name_prefix="system-cleanup"
+        )
         self.initialize()
         
     def initialize(self):
         """Initialize the system manager."""
+        # Take the CPU samples that later non-blocking readings are measured
+        # against; psutil keeps per-process ones on the objects process_iter reuses
+        psutil.cpu_percent(interval=None)
+        self._snapshot_processes()
+        
         # Start monitoring thread
         self._start_monitor_thread()
         
@@ -62,7 +219,10 @@ class SystemManager:
         
     def _monitor_worker(self):
         """Background monitoring worker."""
-        while True:
+        # Readings taken right after the baseline would span almost no time
+        if self._stop_event.wait(CPU_BASELINE_DELAY):
+            return
+        while not self._stop_event.is_set():
             try:
                 # Get system metrics
                 metrics = self._get_system_metrics()
@@ -74,24 +234,26 @@ class SystemManager:
                 if issues:
                     self._handle_resource_issues(issues)
                     
-                # Sleep for monitor interval
-                time.sleep(self.config.monitor_interval)
+                # Sleep for monitor interval, waking early on stop
+                self._stop_event.wait(self.config.monitor_interval)
                 
             except Exception as e:
                 logging.error(f"Monitor worker error: {e}")
                 
-    def _get_system_metrics(self) -> Dict[str, Any]:
-        """Get system metrics."""
+    def _get_system_metrics(self, include_processes: bool = False) -> Dict[str, Any]:
+        """Get system metrics; the per-process list only when include_processes is set."""
         try:
             # Get CPU metrics
+            freq = self._cached("cpu_freq", psutil.cpu_freq)
             cpu_metrics = {
-                "percent": psutil.cpu_percent(interval=1),
-                "count": psutil.cpu_count(),
-                "freq": psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None
+                # Usage since the previous reading, without blocking the tick
+                "percent": psutil.cpu_percent(interval=None),
+                "count": self._cached("cpu_count", psutil.cpu_count),
+                "freq": dict(zip(_CPU_FREQ_FIELDS, freq)) if freq else None
             }
             
             # Get memory metrics
-            memory = psutil.virtual_memory()
+            memory = self._cached("vmem", psutil.virtual_memory)
             memory_metrics = {
                 "total": memory.total,
                 "available": memory.available,
@@ -101,7 +263,7 @@ class SystemManager:
             }
             
             # Get disk metrics
-            disk = psutil.disk_usage('/')
+            disk = self._cached("disk", _root_disk_usage)
             disk_metrics = {
                 "total": disk.total,
                 "used": disk.used,
@@ -110,7 +272,7 @@ class SystemManager:
             }
             
             # Get network metrics
-            net_io = psutil.net_io_counters()
+            net_io = self._cached("net_io", psutil.net_io_counters)
             network_metrics = {
                 "bytes_sent": net_io.bytes_sent,
                 "bytes_recv": net_io.bytes_recv,
@@ -118,16 +280,12 @@ class SystemManager:
                 "packets_recv": net_io.packets_recv
             }
             
-            # Get process metrics
-            process_metrics = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    process_metrics.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-                    
+            # Get process metrics; the monitor's threshold checks never read them
+            process_metrics = self._get_process_snapshot().records() if include_processes else None
+            
             return {
-                "timestamp": datetime.now().isoformat(),
+                # Formatted only when get_system_info hands metrics out
+                "timestamp": time.time(),
                 "cpu": cpu_metrics,
                 "memory": memory_metrics,
                 "disk": disk_metrics,
@@ -139,6 +297,65 @@ class SystemManager:
             logging.error(f"Error getting system metrics: {e}")
             return {}
             
+    def _cached(self, key: str, fn: Callable[[], Any], ttl: float = METRIC_CACHE_TTL) -> Any:
+        """Return fn(), reusing the value stored under key if it is younger than ttl seconds."""
+        now = time.monotonic()
+        entry = self._sysmetric_cache.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        value = fn()
+        self._sysmetric_cache[key] = (now, value)
+        return value
+        
+    def _get_process_snapshot(self) -> ProcessSnapshot:
+        """Get the process table, reusing one sampled within the last half monitor interval."""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.taken >= self.config.monitor_interval / 2:
+            snapshot = self._snapshot_processes()
+            self._snapshot = snapshot
+        return snapshot
+        
+    def _snapshot_processes(self) -> ProcessSnapshot:
+        """Walk the process table once."""
+        if self._proc_scanner is not None:
+            try:
+                return self._proc_scanner.scan(self._cached("vmem", psutil.virtual_memory).total)
+            except OSError as e:
+                # e.g. /proc mounted with hidepid; psutil copes with that
+                logging.warning(f"Falling back to psutil for process scans: {e}")
+                self._proc_scanner.close()
+                self._proc_scanner = None
+                
+        now = time.monotonic()
+        interval = now - self._psutil_last_scan if self._psutil_last_scan is not None else 0.0
+        self._psutil_last_scan = now
+        pids, names, cpu, memory = [], [], [], []
+        # ad_value stands in for attributes that are denied instead of raising
+        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent'], ad_value=None):
+            info = proc.info
+            pids.append(info['pid'])
+            names.append(info['name'])
+            cpu.append(info['cpu_percent'] or 0.0)
+            memory.append(info['memory_percent'] or 0.0)
+        return ProcessSnapshot(now, interval, pids, names, cpu, memory)
+        
+    def _sample_processes(self) -> Optional[ProcessSnapshot]:
+        """Walk the process table with CPU usage measured over the last CPU_SAMPLE_WINDOW seconds.
+
+        Returns None when stopping, or when another scan cut the window short:
+        a tick or two over a few milliseconds reads as hundreds of percent.
+        """
+        # A scan reports CPU since the previous one, which may be hours ago
+        # now that ticks skip the process table; start a fresh window first
+        self._snapshot_processes()
+        if self._stop_event.wait(CPU_SAMPLE_WINDOW):
+            return None
+        snapshot = self._snapshot_processes()
+        self._snapshot = snapshot
+        if snapshot.interval < CPU_SAMPLE_WINDOW / 2:
+            return None
+        return snapshot
+        
     def _check_resource_usage(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Check resource usage against thresholds."""
         issues = []
@@ -187,16 +404,14 @@ class SystemManager:
                     f"(threshold: {issue['threshold']}%)"
                 )
                 
-                # Add to optimization queue
-                self.monitor_queue.put({
-                    "type": "optimize",
-                    "issue": issue
-                })
-                
                 # Notify if enabled
                 if self.config.notify_on_issues:
                     self._notify_resource_issue(issue)
                     
+            # Hand the whole list to the optimizer in one assignment
+            self._issue_slot = issues
+            self._issue_event.set()
+            
         except Exception as e:
             logging.error(f"Error handling resource issues: {e}")
             
@@ -210,30 +425,40 @@ class SystemManager:
         
     def _optimization_worker(self):
         """Background optimization worker."""
+        handled = None
         while True:
             try:
-                # Get optimization task from queue
-                task = self.monitor_queue.get()
-                
-                # Process optimization task
-                if task["type"] == "optimize":
-                    self._optimize_resource(task["issue"])
+                # Wait for new issues; clearing first means a later hand-off sets it again
+                self._issue_event.wait()
+                self._issue_event.clear()
+                if self._stop_event.is_set():
+                    return
                     
-                # Mark task as done
-                self.monitor_queue.task_done()
+                # The monitor always hands over a new list, so identity tells
+                # whether it is one already handled without the slot being reset
+                issues = self._issue_slot
+                if issues is None or issues is handled:
+                    continue
+                handled = issues
                 
+                # Run each kind of optimization once, however many issues raised it
+                self._optimize_batch({issue["type"] for issue in issues})
+                    
             except Exception as e:
                 logging.error(f"Optimization worker error: {e}")
                 
-    def _optimize_resource(self, issue: Dict[str, Any]):
-        """Optimize resource usage."""
+    def _optimize_batch(self, issue_types: Set[str]):
+        """Optimize every resource with an issue in one pass."""
         try:
-            if issue["type"] == "cpu":
+            # The tick keeps no process table, so CPU optimization samples its own
+            if "cpu" in issue_types:
                 self._optimize_cpu()
-            elif issue["type"] == "memory":
-                self._optimize_memory()
-            elif issue["type"] == "disk":
-                self._optimize_disk()
+                
+            # Reuse the memory and disk readings taken by the tick that raised the issues
+            if "memory" in issue_types:
+                self._optimize_memory(self._cached("vmem", psutil.virtual_memory, self.config.monitor_interval))
+            if "disk" in issue_types:
+                self._optimize_disk(self._cached("disk", _root_disk_usage, self.config.monitor_interval))
                 
         except Exception as e:
             logging.error(f"Error optimizing resource: {e}")
@@ -242,22 +467,20 @@ class SystemManager:
         """Optimize CPU usage."""
         try:
             # Get top CPU processes
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-                try:
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-                    
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
+            snapshot = self._sample_processes()
+            if snapshot is None:
+                return
+            cpu = snapshot.cpu
+                
+            # Select the top 5 processes by CPU usage without sorting them all
+            top = heapq.nlargest(5, range(len(cpu)), key=cpu.__getitem__)
             
             # Handle high CPU processes
-            for proc in processes[:5]:  # Top 5 processes
-                if proc['cpu_percent'] > 50:  # 50% threshold
+            for i in top:
+                if cpu[i] > 50:  # 50% threshold
                     try:
                         # Get process
-                        process = psutil.Process(proc['pid'])
+                        process = psutil.Process(snapshot.pids[i])
                         
                         # Lower process priority
                         if platform.system() == "Windows":
@@ -271,20 +494,28 @@ class SystemManager:
         except Exception as e:
             logging.error(f"Error optimizing CPU: {e}")
             
-    def _optimize_memory(self):
+    def _optimize_memory(self, memory=None):
         """Optimize memory usage."""
         try:
             # Get memory usage
-            memory = psutil.virtual_memory()
+            if memory is None:
+                memory = self._cached("vmem", psutil.virtual_memory)
             
             if memory.percent > self.config.cleanup_threshold:
                 # Clear system caches
                 if platform.system() == "Windows":
-                    subprocess.run(["cleanmgr", "/sagerun:1"], shell=True)
+                    subprocess.run(["cleanmgr", "/sagerun:1"])
                 else:
-                    subprocess.run(["sync"], shell=True)
-                    with open("/proc/sys/vm/drop_caches", "w") as f:
-                        f.write("3")
+                    # Flush dirty pages, then drop the page cache, dentries and inodes
+                    os.sync()
+                    fd = os.open("/proc/sys/vm/drop_caches", os.O_WRONLY)
+                    try:
+                        os.write(fd, b"3")
+                    finally:
+                        os.close(fd)
+                        
+                # Memory use just changed
+                self._sysmetric_cache.pop("vmem", None)
                         
                 # Clear temporary files
                 temp_dirs = [
@@ -293,25 +524,17 @@ class SystemManager:
                 ]
                 
                 for temp_dir in temp_dirs:
-                    if os.path.exists(temp_dir):
-                        for item in os.listdir(temp_dir):
-                            try:
-                                item_path = os.path.join(temp_dir, item)
-                                if os.path.isfile(item_path):
-                                    os.remove(item_path)
-                                elif os.path.isdir(item_path):
-                                    shutil.rmtree(item_path)
-                            except Exception:
-                                pass
-                                
+                    self._clear_directory(temp_dir)
+                    
         except Exception as e:
             logging.error(f"Error optimizing memory: {e}")
             
-    def _optimize_disk(self):
+    def _optimize_disk(self, disk=None):
         """Optimize disk usage."""
         try:
             # Get disk usage
-            disk = psutil.disk_usage('/')
+            if disk is None:
+                disk = self._cached("disk", _root_disk_usage)
             
             if disk.percent > self.config.cleanup_threshold:
                 # Clear old log files
@@ -338,21 +561,12 @@ class SystemManager:
             
             # Calculate cutoff date
             cutoff_date = datetime.now() - timedelta(days=self.config.log_retention_days)
+            cutoff_ts = cutoff_date.timestamp()
             
             # Cleanup logs
-            for log_dir in log_dirs:
-                if os.path.exists(log_dir):
-                    for item in os.listdir(log_dir):
-                        try:
-                            item_path = os.path.join(log_dir, item)
-                            if os.path.isfile(item_path):
-                                # Check file age
-                                file_time = datetime.fromtimestamp(os.path.getmtime(item_path))
-                                if file_time < cutoff_date:
-                                    os.remove(item_path)
-                        except Exception:
-                            pass
-                            
+            entries = [entry for log_dir in log_dirs for entry in self._scan_directory(log_dir)]
+            self._run_io(self._remove_old_log, entries, cutoff_ts)
+                        
         except Exception as e:
             logging.error(f"Error cleaning up logs: {e}")
             
@@ -368,32 +582,59 @@ class SystemManager:
             
             # Cleanup temp files
             for temp_dir in temp_dirs:
-                if os.path.exists(temp_dir):
-                    for item in os.listdir(temp_dir):
-                        try:
-                            item_path = os.path.join(temp_dir, item)
-                            if os.path.isfile(item_path):
-                                os.remove(item_path)
-                            elif os.path.isdir(item_path):
-                                shutil.rmtree(item_path)
-                        except Exception:
-                            pass
-                            
+                self._clear_directory(temp_dir)
+                
         except Exception as e:
             logging.error(f"Error cleaning up temp files: {e}")
             
+    def _scan_directory(self, directory: str) -> List[os.DirEntry]:
+        """List a directory's entries, or none if it cannot be read."""
+        try:
+            with os.scandir(directory) as it:
+                return list(it)
+        except OSError:
+            return []
+            
+    def _clear_directory(self, directory: str):
+        """Remove the files and directories inside directory, skipping any that cannot be removed."""
+        self._run_io(self._remove_entry, self._scan_directory(directory))
+        
+    def _run_io(self, func: Callable[..., None], entries: List[os.DirEntry], *args):
+        """Call func(entry, *args) for every entry on the cleanup pool and wait for all of them."""
+        # list() drains the results so the caller sees the directory finished
+        list(self._io_pool.map(lambda entry: func(entry, *args), entries))
+        
+    def _remove_entry(self, entry: os.DirEntry):
+        """Remove a file or directory tree, ignoring failures."""
+        try:
+            if entry.is_file():
+                os.unlink(entry.path)
+            elif entry.is_dir():
+                shutil.rmtree(entry.path)
+        except Exception:
+            pass
+            
+    def _remove_old_log(self, entry: os.DirEntry, cutoff_ts: float):
+        """Remove a log file last modified before cutoff_ts, ignoring failures."""
+        try:
+            # Check file age; the directory listing already knows the type
+            if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                os.unlink(entry.path)
+        except Exception:
+            pass
+            
     def _cleanup_package_caches(self):
         """Cleanup package caches."""
         try:
             if platform.system() == "Windows":
                 # Cleanup Windows package cache
-                subprocess.run(["cleanmgr", "/sagerun:1"], shell=True)
+                subprocess.run(["cleanmgr", "/sagerun:1"])
             else:
                 # Cleanup package manager caches
                 if os.path.exists("/var/cache/apt"):
-                    subprocess.run(["apt-get", "clean"], shell=True)
+                    subprocess.run(["apt-get", "clean"])
                 if os.path.exists("/var/cache/yum"):
-                    subprocess.run(["yum", "clean", "all"], shell=True)
+                    subprocess.run(["yum", "clean", "all"])
                     
         except Exception as e:
             logging.error(f"Error cleaning up package caches: {e}")
@@ -407,7 +648,9 @@ class SystemManager:
         """Get system information."""
         try:
             # Get system metrics
-            metrics = self._get_system_metrics()
+            metrics = self._get_system_metrics(include_processes=True)
+            if metrics:
+                metrics["timestamp"] = _iso(metrics["timestamp"])
             
             # Get system info
             system_info = {
@@ -457,14 +700,23 @@ class SystemManager:
     def stop(self):
         """Stop system manager."""
         try:
+            # Wake both workers so they see the stop
+            self._stop_event.set()
+            self._issue_event.set()
+            
             # Stop optimization thread
             if self.optimization_thread:
-                self.monitor_queue.put(None)
                 self.optimization_thread.join()
                 
             # Stop monitor thread
             if self.monitor_thread:
                 self.monitor_thread.join()
                 
+            # Release the process scanner's open stat files
+            if self._proc_scanner is not None:
+                self._proc_scanner.close()
+                
+            self._io_pool.shutdown()
+                
         except Exception as e:
             logging.error(f"Stop error: {e}") 
\ No newline at end of file
@@ -343,7 +343,7 @@ class TaskAutomator:
             
             # Perform dependency analysis
             if "directory" in parameters:
-                result = analyzer.analyze_dependencies(parameters["directory"])
+                result = await analyzer.analyze_dependencies_async(parameters["directory"])
             else:
                 raise ValueError("No directory specified")
                 